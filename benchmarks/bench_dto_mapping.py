@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for DTO construction and serialization.
+
+Compares the compiled dto.json templates against rebuilding the same dict
+literals on every call, and the direct JSON-bytes path against FastAPI's
+generic encoder.
+
+Run from the repository root:
+    python benchmarks/bench_dto_mapping.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization
+from dto_mapper import DTOMapper
+
+SAMPLE_RECORD = {
+    "personal_info": {
+        "name": "Asha Raman",
+        "email": "asha.raman@example.com",
+        "phone": "+91 98450 12345",
+        "address": "12 MG Road, Bengaluru, Karnataka 560001",
+        "date_of_birth": "1991-04-12",
+        "gender": "Female",
+        "marital_status": "Married",
+        "nationality": "Indian",
+        "religion": "Hindu",
+        "blood_group": "B+ve",
+    },
+    "education": [
+        {"qualification_level": "PhD", "course": "Ph.D.", "specialization": "Physics", "institute": "IISc",
+         "year_of_completion": "2020", "country": "India", "state": "Karnataka"},
+        {"qualification_level": "MSc", "course": "M.Sc.", "specialization": "Physics", "institute": "Christ University",
+         "year_of_completion": "2015-2017", "country": "India", "state": "Karnataka"},
+        {"qualification_level": "Class 12", "course": "Class 12", "year_of_completion": "2012", "country": "India",
+         "state": "Kerala"},
+    ],
+    "work_experience": [
+        {"designation": "Assistant Professor", "company": "Christ University", "from_date": "2021-06-01",
+         "to_date": "Present"},
+        {"designation": "Research Associate", "company": "IISc", "from_date": "2019-01-01", "to_date": "2021-05-31"},
+    ],
+    "research_experience": {"has_research": True},
+    "additional_informations": {"skills": ["Python", "Spectroscopy"], "languages": ["English", "Kannada"]},
+}
+
+
+def literal_builder(template):
+    """Compile a function that rebuilds the template as a dict literal, like the old mapper"""
+    fields = ", ".join(f"{key!r}: {value!r}" for key, value in template._base.items())
+    namespace = {}
+    exec(f"def build():\n    return {{{fields}}}", namespace)
+    return namespace["build"]
+
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    mapper = DTOMapper()
+
+    print("DTO mapping microbenchmark")
+    print("=" * 60)
+    print(f"{'section':<22}{'literal us':>12}{'template us':>14}{'speedup':>10}")
+    for name in ("base", "personal", "address", "qualification", "current_experience", "research"):
+        template = mapper.templates[name]
+        literal = per_call_us(literal_builder(template), number)
+        compiled = per_call_us(template.new, number)
+        print(f"{name:<22}{literal:>12.2f}{compiled:>14.2f}{literal / compiled:>9.1f}x")
+
+    mapping = per_call_us(lambda: mapper.map_to_dto(SAMPLE_RECORD), number // 10)
+    print(f"\nmap_to_dto (sample resume): {mapping:.1f} us")
+
+    payload = {"success": True, "data": mapper.map_to_dto(SAMPLE_RECORD), "message": "Resume parsed successfully"}
+    stdlib = per_call_us(lambda: json.dumps(payload).encode("utf-8"), number // 10)
+    direct = per_call_us(lambda: serialization.dumps(payload), number // 10)
+    print(f"\nSerialization ({len(serialization.dumps(payload))} bytes)")
+    print(f"json.dumps:                 {stdlib:8.1f} us")
+    print(f"serialization.dumps:        {direct:8.1f} us  (orjson {'on' if serialization.orjson else 'off'})")
+    try:
+        from fastapi.encoders import jsonable_encoder
+        encoder = per_call_us(lambda: json.dumps(jsonable_encoder(payload)).encode("utf-8"), number // 100)
+        print(f"FastAPI default response:   {encoder:8.1f} us")
+    except ImportError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
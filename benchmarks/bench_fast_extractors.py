@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Accuracy and speed of the local personal-field extractors against the
+fixture set in benchmarks/fixtures/personal_fields.json.
+
+Run from the repository root:
+    python benchmarks/bench_fast_extractors.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fast_extractors import FAST_FIELDS, extract_personal_fields, prefill_text
+from text_preprocessing import estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "personal_fields.json")
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with open(FIXTURES, "r", encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    counts = {field: {"expected": 0, "correct": 0, "wrong": 0, "missed": 0, "spurious": 0} for field in FAST_FIELDS}
+    failures = []
+    for fixture in fixtures:
+        found = extract_personal_fields(fixture["text"])
+        expected = fixture["expected"]
+        for field in FAST_FIELDS:
+            row = counts[field]
+            if field in expected:
+                row["expected"] += 1
+                if field not in found:
+                    row["missed"] += 1
+                elif found[field] == expected[field]:
+                    row["correct"] += 1
+                else:
+                    row["wrong"] += 1
+            elif field in found:
+                row["spurious"] += 1
+            if found.get(field) != expected.get(field):
+                failures.append((fixture["name"], field, expected.get(field), found.get(field)))
+
+    print(f"Fast extractor accuracy ({len(fixtures)} fixtures)")
+    print("=" * 72)
+    print(f"{'field':<16}{'expected':>10}{'correct':>10}{'wrong':>8}{'missed':>8}{'spurious':>10}{'accuracy':>10}")
+    totals = dict.fromkeys(counts[FAST_FIELDS[0]], 0)
+    for field, row in counts.items():
+        for key, value in row.items():
+            totals[key] += value
+        accuracy = row["correct"] / row["expected"] if row["expected"] else 1.0
+        print(f"{field:<16}{row['expected']:>10}{row['correct']:>10}{row['wrong']:>8}{row['missed']:>8}"
+              f"{row['spurious']:>10}{accuracy:>10.0%}")
+    found_total = totals["correct"] + totals["wrong"] + totals["spurious"]
+    precision = totals["correct"] / found_total if found_total else 1.0
+    recall = totals["correct"] / totals["expected"] if totals["expected"] else 1.0
+    print(f"\nprecision {precision:.1%}  recall {recall:.1%}")
+    for name, field, expected, found in failures:
+        print(f"  {name}: {field} expected {expected!r}, got {found!r}")
+
+    texts = [fixture["text"] for fixture in fixtures]
+    extract = min(timeit.repeat(lambda: [extract_personal_fields(text) for text in texts], number=number, repeat=5))
+    prefill = min(timeit.repeat(lambda: [prefill_text(text) for text in texts], number=number, repeat=5))
+    per_resume = number * len(texts)
+    print(f"\nextract_personal_fields: {extract / per_resume * 1e6:8.1f} us per resume")
+    print(f"prefill_text:            {prefill / per_resume * 1e6:8.1f} us per resume")
+
+    before = sum(estimate_tokens(text) for text in texts)
+    after = sum(estimate_tokens(prefill_text(text)[0]) for text in texts)
+    print(f"prompt tokens with prefill: {before} -> {after} ({1 - after / before:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+LLM scheduler against a rate-limited provider.
+
+The mock backend plays a provider that allows RPM requests a minute, enforced
+per second, and answers 429 beyond that. A burst of batch calls arrives at
+once, and interactive calls trickle in while it drains. Three set-ups are
+compared:
+- unpaced:  no rate limit and no retries (what the service did before)
+- backoff:  retries with exponential backoff and jitter, no pacing
+- paced:    token buckets at the provider limit, plus retries
+
+The report gives calls completed and failed, 429s received, throughput and
+the queueing time of each lane.
+
+Run from the repository root:
+    python benchmarks/bench_llm_scheduler.py [rpm] [batch calls] [interactive calls]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openai
+
+from llm_backends import MockBackend
+from llm_scheduler import BATCH, INTERACTIVE, LLMScheduler
+
+LATENCY = 0.05
+MESSAGES = [{"role": "user", "content": "Return the resume as JSON: " + "text " * 600}]
+
+
+class CountingBackend(MockBackend):
+    """Mock provider that counts the 429s it sends"""
+
+    def __init__(self, rpm_limit):
+        super().__init__(latency=LATENCY, jitter=0.0, rpm_limit=rpm_limit)
+        self.rejected = 0
+
+    async def complete(self, messages, temperature, max_tokens):
+        try:
+            return await super().complete(messages, temperature, max_tokens)
+        except openai.RateLimitError:
+            self.rejected += 1
+            raise
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def scenario(rpm, paced, retries, batch_calls, interactive_calls):
+    os.environ.update(LLM_RPM_LIMIT=str(rpm if paced else 0), LLM_TPM_LIMIT="0", LLM_MAX_RETRIES=str(retries),
+                      LLM_RETRY_BASE_DELAY="0.2", LLM_RETRY_MAX_DELAY="5")
+    backend = CountingBackend(rpm)
+    scheduler = LLMScheduler(backend)
+
+    waits = {INTERACTIVE: [], BATCH: []}
+    failed = 0
+
+    async def call(lane):
+        nonlocal failed
+        stats = {"lane": lane}
+        try:
+            await scheduler.complete(MESSAGES, 0.1, 100, stats)
+        except openai.RateLimitError:
+            failed += 1
+        waits[lane].append(stats.get("queue_seconds", 0.0))
+
+    async def interactive():
+        # One interactive upload every 100 ms while the batch drains
+        calls = []
+        for _ in range(interactive_calls):
+            await asyncio.sleep(0.1)
+            calls.append(asyncio.ensure_future(call(INTERACTIVE)))
+        await asyncio.gather(*calls)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[call(BATCH) for _ in range(batch_calls)], interactive())
+    elapsed = time.perf_counter() - started
+    completed = batch_calls + interactive_calls - failed
+    return completed, failed, backend.rejected, completed / elapsed, waits
+
+
+def main():
+    rpm = float(sys.argv[1]) if len(sys.argv) > 1 else 1200
+    batch_calls = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    interactive_calls = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    print(f"Provider limit {rpm:.0f} RPM ({rpm / 60:.0f}/s), {batch_calls} batch + {interactive_calls} "
+          f"interactive calls, {LATENCY * 1000:.0f} ms per reply")
+    print("=" * 96)
+    print(f"{'set-up':<9}{'done':>6}{'failed':>8}{'429s':>6}{'calls/s':>9}"
+          f"{'interactive wait p50/p95':>27}{'batch wait p50/p95':>21}")
+    for name, paced, retries in (("unpaced", False, 0), ("backoff", False, 8), ("paced", True, 4)):
+        completed, failed, rejected, throughput, waits = asyncio.run(
+            scenario(rpm, paced, retries, batch_calls, interactive_calls)
+        )
+        lanes = "".join(
+            f"{percentile(waits[lane], 0.5):>{width - 9}.2f} / {percentile(waits[lane], 0.95):<6.2f}"
+            for lane, width in ((INTERACTIVE, 27), (BATCH, 21))
+        )
+        print(f"{name:<9}{completed:>6}{failed:>8}{rejected:>6}{throughput:>9.1f}{lanes}")
+
+
+if __name__ == "__main__":
+    main()
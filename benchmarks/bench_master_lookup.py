@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the indexed DTOMapper._find_master_id against the original linear scan.
+
+Run from the repository root:
+    python benchmarks/bench_master_lookup.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dto_mapper import DTOMapper
+
+
+def linear_find_master_id(master_data, category, value):
+    """The original implementation: scan every row and lowercase each name"""
+    if not value or category not in master_data:
+        return "1"
+    value_str = str(value).strip() if value is not None else ""
+    if not value_str:
+        return "1"
+    for item in master_data[category].get("values", []):
+        item_name = str(item.get("name", "")).strip()
+        if value_str.lower() in item_name.lower():
+            return str(item.get("id", 1))
+    return "1"
+
+
+def build_queries(master_data, count):
+    """Exact names, substrings, different casing and misses for every category"""
+    rng = random.Random(42)
+    queries = []
+    for category, data in master_data.items():
+        names = [str(item.get("name", "")) for item in data.get("values", []) if item.get("name")]
+        for name in names:
+            queries.append((category, name))
+            queries.append((category, name.upper()))
+            if len(name) > 3:
+                start = rng.randrange(len(name) - 2)
+                queries.append((category, name[start:start + rng.randint(2, 6)]))
+        queries.append((category, "no such value"))
+        queries.append((category, "xq"))
+    rng.shuffle(queries)
+    return (queries * (count // len(queries) + 1))[:count]
+
+
+def time_lookups(lookup, queries):
+    start = time.perf_counter()
+    for category, value in queries:
+        lookup(category, value)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    start = time.perf_counter()
+    mapper = DTOMapper()
+    load_time = time.perf_counter() - start
+
+    queries = build_queries(mapper.master_data, count)
+
+    mismatches = [
+        (category, value)
+        for category, value in set(queries)
+        if linear_find_master_id(mapper.master_data, category, value) != mapper._find_master_id(category, value)
+    ]
+    if mismatches:
+        print(f"ERROR: {len(mismatches)} lookups differ, e.g. {mismatches[:5]}")
+        sys.exit(1)
+
+    linear = time_lookups(lambda c, v: linear_find_master_id(mapper.master_data, c, v), queries)
+    indexed = time_lookups(mapper._find_master_id, queries)
+
+    print("Master data lookup benchmark")
+    print("=" * 50)
+    print(f"Mapper load + index build: {load_time * 1000:.1f} ms")
+    print(f"Lookups: {len(queries)} ({len(set(queries))} distinct), results identical")
+    print(f"Linear scan: {linear / len(queries) * 1e6:8.2f} us/lookup")
+    print(f"Indexed:     {indexed / len(queries) * 1e6:8.2f} us/lookup")
+    print(f"Speedup:     {linear / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+How well text fingerprints match re-uploads of the same resume, and what a
+lookup costs.
+
+For each synthetic resume (benchmarks/corpus.py) the extracted, preprocessed
+text of the PDF is compared with:
+- docx:     the same resume exported as DOCX
+- edited:   the PDF with one line changed (a new mobile number)
+- added:    the PDF with one publication or project line added
+- other:    a different resume of the same kind and length (must not match)
+
+Then the index is filled with stored resumes and the time to fingerprint a
+text and find its closest match is measured.
+
+Run from the repository root:
+    python benchmarks/bench_near_duplicates.py [stored resumes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import KINDS, render_docx, render_pdf, resume_sections
+from fingerprints import FingerprintIndex, fingerprint_text, similarity
+from resume_parser import ResumeParser
+from text_preprocessing import preprocess_text
+
+PAGE_COUNTS = (1, 2, 5, 10)
+
+
+def text_of(content: bytes, filename: str) -> str:
+    text, _ = ResumeParser._extract_text(content, filename, 0, 0)
+    return preprocess_text(text, 0)[0]
+
+
+def edited(sections, rng):
+    """Copy of the sections with the mobile number changed"""
+    heading, lines, table = sections[0]
+    lines = [f"Email: changed@example.com | Mobile: +91 9{rng.randint(100000000, 999999999)}"
+             if line.startswith("Email:") else line for line in lines]
+    return [(heading, lines, table)] + sections[1:]
+
+
+def added(sections, rng):
+    """Copy of the sections with one line added to the longest section"""
+    longest = max(range(len(sections)), key=lambda i: len(sections[i][1]))
+    heading, lines, table = sections[longest]
+    lines = lines + [f"Invited talk on {rng.choice(('thin films', 'graph theory', 'catalysis'))}, 2024"]
+    return sections[:longest] + [(heading, lines, table)] + sections[longest + 1:]
+
+
+def compare(pages, kind):
+    rng = random.Random(pages)
+    seed = pages * 100 + KINDS.index(kind)
+    sections = resume_sections(kind, pages, seed)
+    original = fingerprint_text(text_of(render_pdf(sections), "a.pdf"))
+    variants = {
+        "docx": fingerprint_text(text_of(render_docx(sections), "a.docx")),
+        "edited": fingerprint_text(text_of(render_pdf(edited(sections, rng)), "a.pdf")),
+        "added": fingerprint_text(text_of(render_pdf(added(sections, rng)), "a.pdf")),
+        "other": fingerprint_text(text_of(render_pdf(resume_sections(kind, pages, seed + 7)), "a.pdf")),
+    }
+    return {
+        name: (similarity(original.signature, variant.signature), variant.text_sha256 == original.text_sha256)
+        for name, variant in variants.items()
+    }
+
+
+def lookup_cost(stored):
+    sections = resume_sections("academic", 5, 1)
+    text = text_of(render_pdf(sections), "a.pdf")
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["NEAR_DUP_DB_PATH"] = os.path.join(directory, "fingerprints.sqlite3")
+        os.environ["NEAR_DUP_ENABLED"] = "true"
+        index = FingerprintIndex()
+        for i in range(stored):
+            kind = KINDS[i % len(KINDS)]
+            other = text_of(render_pdf(resume_sections(kind, 1, 10_000 + i)), "a.pdf")
+            index.add(fingerprint_text(other), "bench", {"personal_info": {"name": str(i)}})
+        index.add(fingerprint_text(text), "bench", {"personal_info": {"name": "target"}})
+
+        runs = 50
+        started = time.perf_counter()
+        for _ in range(runs):
+            fingerprint = fingerprint_text(text)
+        fingerprint_ms = (time.perf_counter() - started) / runs * 1000
+        started = time.perf_counter()
+        for _ in range(runs):
+            match = index.find(fingerprint, "bench")
+        find_ms = (time.perf_counter() - started) / runs * 1000
+
+        edited_print = fingerprint_text(text_of(render_pdf(edited(sections, random.Random(0))), "a.pdf"))
+        started = time.perf_counter()
+        for _ in range(runs):
+            near = index.find(edited_print, "bench")
+        near_ms = (time.perf_counter() - started) / runs * 1000
+        index.close()
+    return fingerprint_ms, find_ms, near_ms, match, near
+
+
+def main():
+    stored = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print("Similarity to the PDF of the same resume (estimated Jaccard of word 3-gram shingles)")
+    print("=" * 72)
+    print(f"{'resume':<16}{'docx':>12}{'edited':>12}{'added':>12}{'other':>12}")
+    for pages in PAGE_COUNTS:
+        for kind in KINDS:
+            row = compare(pages, kind)
+            cells = "".join(f"{score:>11.3f}{'=' if exact else ' '}" for score, exact in row.values())
+            print(f"{kind + ' ' + str(pages) + 'p':<16}{cells}")
+    print("(= marks an exact normalized-text match)")
+
+    fingerprint_ms, find_ms, near_ms, match, near = lookup_cost(stored)
+    print()
+    print(f"Lookup cost with {stored + 1} stored resumes (5-page resume)")
+    print("=" * 72)
+    print(f"fingerprint text     {fingerprint_ms:>8.2f} ms")
+    print(f"find, exact match    {find_ms:>8.2f} ms   ({'found' if match and match.exact else 'not found'})")
+    print(f"find, edited resume  {near_ms:>8.2f} ms   "
+          f"(similarity {near.similarity if near else 0:.3f}, {'found' if near else 'not found'})")
+
+
+if __name__ == "__main__":
+    main()
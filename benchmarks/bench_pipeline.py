@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the /parse-resume path on the synthetic corpus.
+
+Times each stage separately for every document: text extraction, prompt
+construction (clean-up + prompt text), the LLM call (mock backend with a fixed
+latency), DTO mapping and JSON serialization. Reports p50/p95/p99 per stage
+and throughput, and saves or compares baselines in benchmarks/baselines/.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py                  # report only
+    python benchmarks/bench_pipeline.py --save           # store as the baseline
+    python benchmarks/bench_pipeline.py --compare        # compare with the baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# The LLM is always mocked and extraction runs in-process so stages are timed alone
+os.environ["LLM_BACKEND"] = "mock"
+os.environ.setdefault("EXTRACTION_WORKERS", "0")
+
+import serialization
+from corpus import PAGE_COUNTS, generate_corpus
+from dto_mapper import DTOMapper
+from resume_parser import ResumeParser
+from text_preprocessing import preprocess_text
+
+STAGES = ("extract", "prompt", "llm", "map", "serialize")
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+# Differences below this many milliseconds are treated as noise when comparing
+NOISE_MS = 0.5
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (q in 0-100)"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values):
+    return {
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "mean": round(sum(values) / len(values) * 1000, 3),
+    }
+
+
+async def time_document(parser, mapper, filename, content):
+    """Seconds spent in each stage for one document"""
+    timings = {}
+
+    started = time.perf_counter()
+    text, _ = ResumeParser._extract_text(content, filename, parser.max_pages, parser.max_chars)
+    timings["extract"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if parser.preprocess:
+        text, _ = preprocess_text(text, parser.max_prompt_tokens)
+    prompt = parser._build_prompt(text)
+    timings["prompt"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    extracted = parser._sanitize_data_types(await parser._complete_json(prompt, {}))
+    timings["llm"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dto = mapper.map_to_dto(extracted)
+    timings["map"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    serialization.dumps({"success": True, "data": dto, "message": "Resume parsed successfully"})
+    timings["serialize"] = time.perf_counter() - started
+    return timings
+
+
+async def run(corpus, repeat, llm_latency):
+    parser = ResumeParser()
+    parser.llm.latency, parser.llm.jitter = llm_latency, 0.0
+    mapper = DTOMapper()
+
+    samples = {stage: [] for stage in STAGES}
+    totals, by_document = [], {}
+    try:
+        for _ in range(repeat):
+            for filename, content in corpus:
+                timings = await time_document(parser, mapper, filename, content)
+                for stage, seconds in timings.items():
+                    samples[stage].append(seconds)
+                total = sum(timings.values())
+                totals.append(total)
+                by_document.setdefault(filename, []).append(total)
+    finally:
+        await parser.close()
+
+    local = [total - llm for total, llm in zip(totals, samples["llm"])]
+    return {
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "total": summarize(totals),
+        "throughput": {
+            # Documents per second for one request at a time, with and without the LLM wait
+            "end_to_end_docs_per_s": round(len(totals) / sum(totals), 2),
+            "local_docs_per_s": round(len(local) / sum(local), 2),
+        },
+        "documents": {filename: summarize(values)["p50"] for filename, values in by_document.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=BENCH_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(result):
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for stage, row in list(result["stages"].items()) + [("total", result["total"])]:
+        print(f"{stage:<12}{row['p50']:>10.2f}{row['p95']:>10.2f}{row['p99']:>10.2f}{row['mean']:>10.2f}")
+    throughput = result["throughput"]
+    print(f"\nthroughput: {throughput['end_to_end_docs_per_s']} docs/s end to end, "
+          f"{throughput['local_docs_per_s']} docs/s excluding the LLM call")
+    print("\nper document (total p50 ms):")
+    for filename, p50 in result["documents"].items():
+        print(f"  {filename:<24}{p50:>10.2f}")
+
+
+def compare(result, baseline, threshold):
+    """Print the change against a baseline; returns the number of regressions"""
+    print(f"\nCompared with baseline {baseline['meta']['commit']} ({baseline['meta']['created']})")
+    print(f"{'stage':<12}{'metric':>8}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = 0
+    rows = [(stage, result["stages"][stage], baseline["stages"].get(stage)) for stage in STAGES]
+    rows.append(("total", result["total"], baseline["total"]))
+    for stage, current, before in rows:
+        if not before:
+            continue
+        for metric in ("p50", "p95", "p99"):
+            change = (current[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            regressed = change > threshold and current[metric] - before[metric] > NOISE_MS
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{stage:<12}{metric:>8}{before[metric]:>12.2f}{current[metric]:>12.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="fixed latency of the mocked LLM call")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(PAGE_COUNTS), help="corpus document lengths")
+    parser.add_argument("--save", nargs="?", const="pipeline", metavar="NAME", help="store the result as a baseline")
+    parser.add_argument("--compare", nargs="?", const="pipeline", metavar="NAME", help="compare with a baseline")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(page_counts=tuple(args.pages))
+    print(f"Pipeline benchmark: {len(corpus)} documents x {args.repeat}, mocked LLM {args.llm_latency_ms:g} ms")
+    print("=" * 52)
+    result = asyncio.run(run(corpus, args.repeat, args.llm_latency_ms / 1000))
+    result["meta"] = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "llm_latency_ms": args.llm_latency_ms,
+        "pages": args.pages,
+    }
+    print_report(result)
+
+    status = 0
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["llm_latency_ms"] != args.llm_latency_ms or baseline["meta"]["pages"] != args.pages:
+            print("\nwarning: baseline was recorded with a different corpus or LLM latency")
+        status = 1 if compare(result, baseline, args.threshold) else 0
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline saved to {os.path.relpath(path)}")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
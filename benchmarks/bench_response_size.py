@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Measure payload size and encoding time of the compact response options.
+
+Run from the repository root:
+    python benchmarks/bench_response_size.py
+"""
+import gzip
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization
+from bench_dto_mapping import SAMPLE_RECORD
+from dto_mapper import DTOMapper
+
+VARIANTS = [
+    ("full DTO", None, False),
+    ("exclude_nulls", None, True),
+    ("fields=education,experience", "educationalDetailDTO,professionalExperienceDTO", False),
+    ("fields + exclude_nulls", "educationalDetailDTO,professionalExperienceDTO", True),
+]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dto = DTOMapper().map_to_dto(SAMPLE_RECORD)
+
+    encodings = [("json", "application/json")]
+    if serialization.msgpack is not None:
+        encodings.append(("msgpack", "application/msgpack"))
+
+    print("Response size benchmark")
+    print("=" * 78)
+    print(f"{'variant':<32}{'encoding':<10}{'bytes':>8}{'gzip bytes':>12}{'encode us':>12}")
+    baseline = None
+    for name, fields, exclude_nulls in VARIANTS:
+        for encoding, accept in encodings:
+            def run():
+                payload = {"success": True, "data": serialization.shape_dto(dto, fields, exclude_nulls)}
+                return serialization.encode(payload, accept)[0]
+
+            body = run()
+            compressed = gzip.compress(body, compresslevel=9)
+            seconds = min(timeit.repeat(run, number=number, repeat=5)) / number
+            baseline = baseline or len(body)
+            print(f"{name:<32}{encoding:<10}{len(body):>8}{len(compressed):>12}{seconds * 1e6:>12.1f}")
+
+    print(f"\nBaseline is {baseline} bytes; gzip applies when the client sends Accept-Encoding: gzip.")
+
+
+if __name__ == "__main__":
+    main()
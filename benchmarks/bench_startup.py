@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Startup cost of DTOMapper with and without the master-data snapshot.
+
+Each scenario runs in a fresh interpreter and reports the time to construct
+the mapper, the time to map a first resume (which unpacks the categories it
+touches), and resident memory after each step:
+- json:     parse the master-data JSON and build every index (no snapshot)
+- rebuild:  snapshot missing or stale, so it is compiled first
+- snapshot: snapshot up to date, categories loaded lazily
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, os.path.join(sys.argv[1], "benchmarks"))
+sys.path.insert(0, sys.argv[1])
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from bench_dto_mapping import SAMPLE_RECORD
+import dto_mapper
+baseline = rss_mb()
+
+started = time.perf_counter()
+mapper = dto_mapper.DTOMapper()
+init = time.perf_counter() - started
+after_init = rss_mb()
+
+started = time.perf_counter()
+mapper.map_to_dto(SAMPLE_RECORD)
+first_map = time.perf_counter() - started
+
+print(json.dumps({
+    "init_ms": init * 1000,
+    "first_map_ms": first_map * 1000,
+    "init_rss_mb": after_init - baseline,
+    "mapped_rss_mb": rss_mb() - baseline,
+}))
+"""
+
+SCENARIOS = ("json", "rebuild", "snapshot")
+
+
+def run_child(snapshot_path):
+    env = dict(os.environ, MASTER_SNAPSHOT_PATH=snapshot_path)
+    output = subprocess.run([sys.executable, "-c", CHILD, ROOT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {scenario: [] for scenario in SCENARIOS}
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "master_data.snapshot")
+        for _ in range(runs):
+            results["json"].append(run_child(""))
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+            results["rebuild"].append(run_child(snapshot_path))
+            results["snapshot"].append(run_child(snapshot_path))
+        snapshot_kb = os.path.getsize(snapshot_path) / 1024
+
+    print(f"DTOMapper startup (median of {runs} fresh processes, snapshot {snapshot_kb:.0f} KB)")
+    print("=" * 72)
+    print(f"{'scenario':<10}{'init ms':>10}{'first map ms':>14}{'RSS after init':>17}{'after map':>12}")
+    for scenario, rows in results.items():
+        row = {key: median([result[key] for result in rows]) for key in rows[0]}
+        print(f"{scenario:<10}{row['init_ms']:>10.1f}{row['first_map_ms']:>14.2f}"
+              f"{row['init_rss_mb']:>14.1f} MB{row['mapped_rss_mb']:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
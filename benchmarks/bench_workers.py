@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Memory of the production launcher (gunicorn_conf.py) for several worker counts,
+with and without the preloaded, frozen app.
+
+Starts gunicorn with the mock LLM backend, sends a few resumes through every
+worker, then reads /proc/<pid>/smaps_rollup (Linux) for the master and each
+worker:
+- RSS counts shared pages in full for every process
+- PSS splits shared pages between the processes sharing them
+- USS is what a worker holds alone (what one more worker would cost)
+
+Run from the repository root (needs gunicorn):
+    python benchmarks/bench_workers.py [worker counts...]
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import generate_corpus
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid):
+    """RSS, PSS and USS of a process in kB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(workers, preload, documents, port):
+    env = dict(os.environ, LLM_BACKEND="mock", LLM_MOCK_LATENCY_MS="5", LLM_MOCK_JITTER_MS="0",
+               EXTRACTION_WORKERS="0", CACHE_ENABLED="false", NEAR_DUP_ENABLED="false", WEB_WORKERS=str(workers),
+               WEB_PRELOAD="true" if preload else "false", HOST="127.0.0.1", PORT=str(port),
+               JOB_DB_PATH=os.path.join(tempfile.gettempdir(), f"bench_workers_{port}.sqlite3"))
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "main:app"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/health").status_code == 200 and len(children(server.pid)) == workers:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline or server.poll() is not None:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.2)
+
+        # Enough requests that every worker maps a few resumes
+        with httpx.Client(timeout=60) as client:
+            for _ in range(workers * 3):
+                for filename, content in documents:
+                    client.post(f"{url}/parse-resume", files={"file": (filename, content)}).raise_for_status()
+
+        master = memory_kb(server.pid)
+        per_worker = [memory_kb(pid) for pid in children(server.pid)]
+        return master, per_worker
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 4, 8]
+    documents = generate_corpus(page_counts=(2,), kinds=("academic",))
+
+    print("Gunicorn memory per worker (MB), after each worker has parsed a few resumes")
+    print("=" * 84)
+    print(f"{'workers':>7} {'preload':>8} {'master RSS':>11} {'worker RSS':>11} {'worker PSS':>11} "
+          f"{'worker USS':>11} {'total PSS':>10}")
+    for count in counts:
+        for preload in (False, True):
+            master, per_worker = measure(count, preload, documents, free_port())
+            average = {key: sum(w[key] for w in per_worker) / len(per_worker) / 1024 for key in ("rss", "pss", "uss")}
+            total_pss = (master["pss"] + sum(w["pss"] for w in per_worker)) / 1024
+            print(f"{count:>7} {'yes' if preload else 'no':>8} {master['rss'] / 1024:>11.1f} {average['rss']:>11.1f} "
+                  f"{average['pss']:>11.1f} {average['uss']:>11.1f} {total_pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
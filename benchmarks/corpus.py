@@ -0,0 +1,179 @@
+"""
+Synthetic resume corpus for the benchmarks: PDFs and DOCX files from 1 to 60
+pages, academic CVs (long publication lists) and industry resumes, with
+education tables.
+
+    python benchmarks/corpus.py [output_dir]
+
+writes the corpus to disk (default benchmarks/corpus/) for manual testing;
+the benchmarks build it in memory with generate_corpus().
+"""
+import io
+import os
+import random
+import sys
+from typing import List, Tuple
+
+from docx import Document
+
+PAGE_COUNTS = (1, 2, 5, 10, 30, 60)
+KINDS = ("academic", "industry")
+FORMATS = ("pdf", "docx")
+LINES_PER_PAGE = 50
+
+_FIRST = ("Asha", "Rahul", "Meera", "Arjun", "Kavya", "Vikram", "Sneha", "Joseph", "Priya", "Anil")
+_LAST = ("Raman", "Menon", "Iyer", "Das", "Nair", "Singh", "Pillai", "Thomas", "Kumar", "George")
+_CITIES = (("Bengaluru", "Karnataka", "560001"), ("Kochi", "Kerala", "682020"), ("Chennai", "Tamil Nadu", "600042"),
+           ("Pune", "Maharashtra", "411001"), ("Gurugram", "Haryana", "122001"))
+_TOPICS = ("spectroscopy", "thin films", "machine learning", "graph theory", "catalysis", "climate models",
+           "protein folding", "signal processing", "number theory", "soft matter")
+_WORDS = ("analysis", "design", "study", "novel", "approach", "efficient", "framework", "experimental",
+          "results", "model", "data", "performance", "synthesis", "characterization", "optimization")
+_JOURNALS = ("Physical Review B", "Journal of Applied Physics", "IEEE Transactions on Signal Processing",
+             "Journal of Catalysis", "Nature Communications", "Applied Surface Science")
+_COMPANIES = ("Infosys", "Wipro", "TCS", "Flipkart", "Zoho", "Freshworks", "HCL", "Tech Mahindra")
+_ROLES = ("Software Engineer", "Senior Software Engineer", "Data Analyst", "Team Lead", "Product Manager")
+_DEGREES = (("PhD", "Ph.D. Physics", "IISc Bengaluru"), ("MSc", "M.Sc. Physics", "Christ University"),
+            ("BSc", "B.Sc. Physics", "St. Joseph's College"), ("Class 12", "Class 12", "Kendriya Vidyalaya"),
+            ("Class 10", "Class 10", "Kendriya Vidyalaya"))
+
+
+def _title(rng: random.Random) -> str:
+    words = rng.sample(_WORDS, 4) + [rng.choice(_TOPICS)]
+    return " ".join(words).capitalize()
+
+
+def resume_sections(kind: str, pages: int, seed: int) -> List[Tuple[str, List[str], List[List[str]]]]:
+    """
+    Resume content as (heading, lines, table rows) sections, long enough to
+    fill about the given number of pages
+    """
+    rng = random.Random(seed)
+    name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+    city, state, pincode = rng.choice(_CITIES)
+    year = rng.randint(1975, 1995)
+    sections = [
+        ("", [name,
+              f"Email: {name.lower().replace(' ', '.')}@example.com | Mobile: +91 9{rng.randint(100000000, 999999999)}",
+              f"{rng.randint(1, 200)} MG Road, {city}, {state} - {pincode}",
+              f"Date of Birth: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{year}"], []),
+        ("EDUCATION", [], [["Qualification", "Course", "Institute", "Year", "Grade"]] + [
+            [level, course, institute, str(year + 18 + 3 * i), f"{rng.randint(60, 95)}%"]
+            for i, (level, course, institute) in enumerate(reversed(_DEGREES))
+        ]),
+    ]
+
+    skills = ("SKILLS", [", ".join(rng.sample(_WORDS, 6)), "Languages: English, Hindi"], [])
+    if kind == "academic":
+        sections += [
+            ("WORK EXPERIENCE", [f"Assistant Professor, {rng.choice(_CITIES)[0]} University, {year + 30} - Present",
+                                 f"Postdoctoral Fellow, IISc Bengaluru, {year + 27} - {year + 30}"], []),
+            ("RESEARCH INTERESTS", [", ".join(rng.sample(_TOPICS, 3))], []),
+        ]
+    else:
+        sections.append(
+            ("PROFESSIONAL SUMMARY", [f"Engineer with experience in {', '.join(rng.sample(_TOPICS, 2))}"], [])
+        )
+
+    # Fill the remaining lines of the last page with the long sections
+    used = sum(len(body) + len(table) + (2 if heading else 0) for heading, body, table in sections + [skills])
+    budget = max(pages * LINES_PER_PAGE - used - 4, 2)
+    if kind == "academic":
+        conferences = [f"Presented '{_title(rng)}' at the National Conference on {rng.choice(_TOPICS)}"
+                       for _ in range(budget // 4)]
+        publications = [f"[{i + 1}] {_title(rng)}, {rng.choice(_JOURNALS)}, "
+                        f"{rng.randint(10, 120)}, {rng.randint(1, 9999)} ({rng.randint(year + 22, 2024)})"
+                        for i in range(budget - len(conferences))]
+        sections += [("PUBLICATIONS", publications, []), ("CONFERENCES", conferences, [])]
+    else:
+        experience = []
+        start = year + 22
+        while len(experience) < budget:
+            end = start + rng.randint(1, 4)
+            experience.append(f"{rng.choice(_ROLES)}, {rng.choice(_COMPANIES)}, {start} - {end}")
+            experience += [f"- {_title(rng)} for {rng.randint(2, 40)} clients" for _ in range(rng.randint(4, 12))]
+            start = end
+        sections.append(("WORK EXPERIENCE", experience[:budget + 2], []))
+    sections.append(skills)
+    return sections
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal PDF with one Helvetica text line per entry of each page"""
+    count = len(pages)
+    font = 3 + 2 * count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(count))}] /Count {count} >>",
+    ]
+    for i, lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 40 800 Td 15 TL " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def render_pdf(sections) -> bytes:
+    """Lay the sections out on pages; tables become column-aligned text"""
+    lines = []
+    for heading, body, table in sections:
+        if heading:
+            lines += ["", heading]
+        lines += ["   ".join(cell.ljust(14) for cell in row).rstrip() for row in table]
+        lines += body
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    return make_pdf(pages)
+
+
+def render_docx(sections) -> bytes:
+    document = Document()
+    for heading, body, table in sections:
+        if heading:
+            document.add_heading(heading, level=1)
+        if table:
+            grid = document.add_table(rows=len(table), cols=len(table[0]))
+            for row, values in zip(grid.rows, table):
+                for cell, value in zip(row.cells, values):
+                    cell.text = value
+        for line in body:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_corpus(page_counts=PAGE_COUNTS, kinds=KINDS, formats=FORMATS) -> List[Tuple[str, bytes]]:
+    """(filename, content) for every combination of length, kind and format"""
+    corpus = []
+    for pages in page_counts:
+        for kind in kinds:
+            sections = resume_sections(kind, pages, seed=pages * 100 + kinds.index(kind))
+            for fmt in formats:
+                content = render_pdf(sections) if fmt == "pdf" else render_docx(sections)
+                corpus.append((f"{kind}_{pages:02d}p.{fmt}", content))
+    return corpus
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+    os.makedirs(target, exist_ok=True)
+    for filename, content in generate_corpus():
+        with open(os.path.join(target, filename), "wb") as f:
+            f.write(content)
+        print(f"{filename:<24}{len(content):>10} bytes")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible chat-completions server backed by the mock LLM backend,
+for load-testing the real HTTP path without network access.
+
+Run from the repository root:
+    python benchmarks/mock_llm_server.py [port]
+
+then start the API with LLM_BACKEND=local LLM_BASE_URL=http://127.0.0.1:8001/v1
+(LLM_MOCK_LATENCY_MS, LLM_MOCK_JITTER_MS and LLM_MOCK_RESPONSE_FILE apply here).
+"""
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+os.environ["LLM_BACKEND"] = "mock"
+from llm_backends import create_backend
+
+app = FastAPI(title="Mock LLM")
+backend = create_backend()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    content, usage = await backend.complete(messages, body.get("temperature", 1.0), body.get("max_tokens") or 4096)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", backend.model),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": dict(usage, total_tokens=usage["prompt_tokens"] + usage["completion_tokens"]),
+    }
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]) if len(sys.argv) > 1 else 8001, log_level="warning")
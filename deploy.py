@@ -71,8 +71,13 @@ source venv/bin/activate
 # Set environment variables
 export OPENAI_API_KEY=$(grep OPENAI_API_KEY .env | cut -d '=' -f2)
 
-# Start the service
-python main.py
+# Compile the master-data snapshot once, before any worker starts
+python master_snapshot.py
+
+# Start the service: gunicorn forks WEB_WORKERS uvicorn workers (default: one
+# per CPU) from a preloaded app; see gunicorn_conf.py. exec lets SIGTERM reach
+# gunicorn directly so in-flight requests are drained on shutdown.
+exec gunicorn -c gunicorn_conf.py main:app
 """
     
     with open("start.sh", "w") as f:
@@ -110,7 +115,7 @@ def main():
     print("1. Ensure your OpenAI API key is set in .env file")
     print("2. Run: python main.py")
     print("3. Test the service: curl http://localhost:8000/health")
-    print("4. For production, use: ./start.sh")
+    print("4. For production, use: ./start.sh (gunicorn, one worker per CPU; set WEB_WORKERS to change)")
     print("\nFor React integration, see INTEGRATION_GUIDE.md")
 
 if __name__ == "__main__":
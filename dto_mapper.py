@@ -1,18 +1,147 @@
-import json
-from typing import Dict, Any, List, Optional
+import asyncio
+import os
+import re
+import threading
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, date
+from master_snapshot import DEFAULT_SNAPSHOT_PATH, DEFAULT_SOURCE_PATH, MasterData, load_master_data, source_hash
+from dto_templates import compile_templates
+from metrics import MASTER_MATCHES
+
+# Bump whenever mapping output changes so cached results are not reused
+MAPPER_VERSION = "4"
+
+# Date formats tried in order; ambiguous numeric dates keep the original preference
+DATE_FORMATS = (
+    "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y",
+    "%b %Y", "%B %Y", "%m/%Y", "%m-%Y", "%Y-%m", "%Y",
+)
+ONGOING_DATES = {"present", "current", "now", "ongoing", "till date", "to date"}
+
+@lru_cache(maxsize=4096)
+def _parse_date_value(value: str) -> Optional[datetime]:
+    """Parse one date string, memoized so each distinct string is parsed once"""
+    text = " ".join(value.replace(",", " ").replace(".", " ").split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """Parse a date field value"""
+    if not value:
+        return None
+    return _parse_date_value(str(value).strip())
+
+def _resolve_end_date(value: Any) -> Optional[datetime]:
+    """Parse an end date, treating "Present" and similar as now"""
+    if value and str(value).strip().lower() in ONGOING_DATES:
+        return datetime.now()
+    return _parse_date(value)
+
+# Master-data matches below full confidence, collected per map_to_dto call
+_match_report: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("master_data_match_report", default=None)
+
+# Master data pinned for the duration of one map_to_dto call, so a reload in
+# the middle of a mapping never mixes IDs from two versions
+_active_master: ContextVar[Optional[MasterData]] = ContextVar("active_master_data", default=None)
 
 class DTOMapper:
     def __init__(self):
-        # Load master data mappings
-        with open("complete_master_data_mappings_csv_only.json", "r", encoding="utf-8") as f:
-            self.master_data = json.load(f)["master_data_mappings"]
+        # Load master data mappings and their lookup indexes from the precompiled
+        # snapshot (rebuilt if the JSON changed); categories unpack on first use
+        self.master_source_path = os.getenv("MASTER_DATA_PATH", DEFAULT_SOURCE_PATH)
+        self.master_snapshot_path = os.getenv("MASTER_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        self.master = load_master_data(self.master_source_path, self.master_snapshot_path)
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+        self.master_watch_interval = float(os.getenv("MASTER_DATA_WATCH_INTERVAL", "0"))
+        
+        # Compile the DTO skeletons once from dto.json
+        self.templates = compile_templates("dto.json")
+        
+        # Fuzzy fallback for values that are not a substring of any master name
+        self.fuzzy_min_score = float(os.getenv("MASTER_FUZZY_MIN_SCORE", "0.7"))
+        self.fuzzy_top_k = int(os.getenv("MASTER_FUZZY_TOP_K", "5"))
     
-    def map_to_dto(self, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+    @property
+    def master_data(self):
+        """Category -> master-data JSON object of the active version"""
+        return self.master.data
+    
+    @property
+    def master_indexes(self):
+        """Category -> CategoryIndex of the active version"""
+        return (_active_master.get() or self.master).indexes
+    
+    def reload_master_data(self) -> Dict[str, Any]:
         """
-        Map extracted resume data to the required DTO format
+        Load the master data again if its source file changed and swap it in.
+        The new version is built and the categories in use are unpacked
+        before the swap, so requests never wait on it; mappings already
+        running finish on the version they started with.
         """
+        with self._reload_lock:
+            current = self.master
+            if source_hash(self.master_source_path) == current.source_sha256:
+                return {"reloaded": False, "version": current.version}
+            
+            master = load_master_data(self.master_source_path, self.master_snapshot_path)
+            master.preload(current.loaded_categories)
+            self.master = master
+            return {"reloaded": True, "version": master.version, "previous_version": current.version}
+    
+    def start_watcher(self):
+        """Poll the master-data file every MASTER_DATA_WATCH_INTERVAL seconds (0 = off)"""
+        if self.master_watch_interval > 0:
+            self._watcher = asyncio.ensure_future(self._watch_master_data())
+    
+    async def stop_watcher(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+    
+    async def _watch_master_data(self):
+        def signature():
+            try:
+                stat = os.stat(self.master_source_path)
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                return None
+        
+        seen = signature()
+        while True:
+            await asyncio.sleep(self.master_watch_interval)
+            current = signature()
+            if current is None or current == seen:
+                continue
+            seen = current
+            try:
+                await asyncio.to_thread(self.reload_master_data)
+            except Exception as e:
+                # Keep serving the previous version until the file changes again
+                # (e.g. the ERP export was caught half written)
+                print(f"Master data reload failed: {str(e)}")
+    
+    def map_to_dto(self, extracted_data: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Map extracted resume data to the required DTO format.
+        If a stats dict is given, master-data values that were fuzzy matched or
+        defaulted are listed in it with their confidence, along with the
+        master-data version used.
+        """
+        master = self.master
+        report_token = _match_report.set([])
+        master_token = _active_master.set(master)
         try:
+            # Parse every date in the record once up front
+            unparsed_dates = self._normalize_dates(extracted_data)
+            
             # Create base DTO structure
             dto = self._create_base_dto()
             
@@ -37,294 +166,110 @@ class DTOMapper:
             if "additional_informations" in extracted_data:
                 dto["additionalInformations"] = self._map_additional_info(extracted_data["additional_informations"])
             
+            if stats is not None:
+                stats["master_data"] = master.version
+                stats["master_data_matches"] = _match_report.get()
+                stats["unparsed_dates"] = unparsed_dates
+            
             return dto
             
         except Exception as e:
             raise Exception(f"Error mapping to DTO: {str(e)}")
+        finally:
+            _match_report.reset(report_token)
+            _active_master.reset(master_token)
+    
+    def _normalize_dates(self, extracted_data: Dict[str, Any]) -> List[str]:
+        """
+        Parse every date field in the extracted record once; the mapping helpers
+        then hit the memoized parser. Returns the values that could not be parsed.
+        """
+        values = []
+        personal_info = extracted_data.get("personal_info")
+        if isinstance(personal_info, dict):
+            values.append(personal_info.get("date_of_birth"))
+        for exp in extracted_data.get("work_experience") or []:
+            if isinstance(exp, dict):
+                values.append(exp.get("from_date"))
+                values.append(exp.get("to_date"))
+        
+        unparsed = []
+        for value in values:
+            if value and _resolve_end_date(value) is None and str(value) not in unparsed:
+                unparsed.append(str(value))
+        return unparsed
     
     def _create_base_dto(self) -> Dict[str, Any]:
         """Create base DTO structure"""
-        return {
-            "empApplnEntriesId": 0,
-            "saveMode": "save draft",
-            "applicationNo": None,
-            "empApplicationRegistrationId": None,
-            "isAvailableForTheInterview": None,
-            "empApplnInterviewSchedulesId": None,
-            "interviewRound": None,
-            "isAcceptOffer": None,
-            "reportingDate": None,
-            "joiningDate": None,
-            "jobDetailDTO": {
-                "empApplnEntriesId": 0,
-                "postAppliedFor": "1",
-                "subjectCategoryIds": [[]],
-                "specializationIds": None,
-                "empApplnSubjectCategoryDTO": [],
-                "preferredLocationIds": [],
-                "empDTO": None,
-                "empJobDetails": None,
-                "erpRoomEmpMappingDTO": None,
-                "empGuestContractDetailsDTO": None,
-                "subjectCategory": None,
-                "subjectSpecialization": None,
-                "empApplnCampusPrefDTOList": None
-            },
-            "empApplnPersonalDataDTO": {},
-            "addressDetailDTO": {},
-            "educationalDetailDTO": {},
-            "professionalExperienceDTO": {},
-            "researchDetailDTO": {
-                "isResearchExperience": "No",
-                "inflibnetVidwanNo": None,
-                "scopusId": None,
-                "hIndex": None,
-                "researchEntries": {
-                    "empApplnAddtnlInfoEntriesId": None,
-                    "isResearchExperience": None,
-                    "researchEntriesHeadings": None,
-                    "entriesId": None,
-                    "parameterId": None,
-                    "addtnlInfoValue": None
-                },
-                "isInterviewedBefore": "No",
-                "interviewedBeforeDepartment": None,
-                "interviewedBeforeYear": None,
-                "interviewedBeforeApplicationNo": None,
-                "interviewedBeforeSubject": None,
-                "vacancyInformationId": "5",
-                "aboutVacancyOthers": None,
-                "otherInformation": None,
-                "orcidId": None,
-                "hindex": None
-            },
-            "additionalPersonalDataDTO": None,
-            "empJobDetailsDTO": None,
-            "empApplnNonAvailabilityDTO": None,
-            "jobCategoryDTO": None,
-            "empGratuityNomineesDTO": None,
-            "empPfNomineesDTO": None,
-            "regretLetterfileUploadDownloadDTO": None,
-            "familyDetailsAddtnlList": None,
-            "dependentDetailsAddtnlList": None,
-            "additionalInformations": None,
-            "empApplnSubjectCategory": None,
-            "empApplnSubjectCategorySpecialization": None,
-            "locationPref": None,
-            "academic": False,
-            "maritalStatusDTO": None,
-            "submissionDate": None,
-            "identityRow": None,
-            "campusPreference": None,
-            "applicantWorkFlowStatusCode": None,
-            "applicationWorkFlowStatusCode": None,
-            "empAppliedEmployeCategory": None,
-            "majorAchievements": None,
-            "offerLetterfileUploadDownloadDTO": None
-        }
+        return self.templates["base"].new(
+            jobDetailDTO=self.templates["job_detail"].new(),
+            researchDetailDTO=self.templates["research"].new(
+                researchEntries=self.templates["research_entries"].new()
+            )
+        )
     
     def _map_personal_data(self, personal_info: Dict[str, Any]) -> Dict[str, Any]:
         """Map personal information to DTO"""
-        return {
-            "empApplnPersonalDataId": 0,
-            "empApplnEntriesId": 0,
-            "applicantName": personal_info.get("name", ""),
-            "genderId": self._find_master_id("gender", personal_info.get("gender", "")),
-            "fatherName": None,  # Not typically in resumes
-            "motherName": None,  # Not typically in resumes
-            "dateOfBirth": self._format_date(personal_info.get("date_of_birth")),
-            "emailId": personal_info.get("email", ""),
-            "mobileNoCountryCode": "+91",  # Default for India
-            "mobileNo": personal_info.get("phone", ""),
-            "alternateNo": None,
-            "aadharNo": personal_info.get("aadhar_no"),
-            "maritalStatusId": self._find_master_id("marital_status", personal_info.get("marital_status", "")),
-            "nationalityId": self._find_master_id("country", personal_info.get("nationality", "India")),
-            "passportNo": personal_info.get("passport_no"),
-            "religionId": self._find_master_id("religion", personal_info.get("religion", "")),
-            "isMinority": "No",  # Default
-            "reservationCategoryId": "3",  # Default
-            "bloodGroupId": self._find_master_id("blood_group", personal_info.get("blood_group", "")),
-            "isDifferentlyAbled": "No",  # Default
-            "differentlyAbledId": None,
-            "differentlyAbledDetails": None,
-            "currentAddressLine1": None,
-            "currentAddressLine2": None,
-            "currentCountryId": None,
-            "currentStateId": None,
-            "currentStateOthers": None,
-            "currentCityId": None,
-            "currentCityOthers": None,
-            "currentPincode": None,
-            "isPermanentEqualsCurrent": None,
-            "permanentAddressLine1": None,
-            "permanentAddressLine2": None,
-            "permanentCountryId": None,
-            "permanentStateId": None,
-            "permanentStateOthers": None,
-            "permanentCityId": None,
-            "permanentCityOthers": None,
-            "permanentPincode": None,
-            "profilePhotoUrl": None,
-            "isUanNo": None,
-            "uanNo": None,
-            "highestQualificationLevel": None,
-            "originalFileName": None,
-            "uniqueFileName": None,
-            "newFile": False,
-            "processCode": None,
-            "actualPath": None,
-            "tempPath": None,
-            "orcidNo": None,
-            "vidwanNo": None,
-            "scopusNo": None,
-            "resumeUploadDTO": None,
-            "resumeUrl": None,
-            "hindexNo": None
-        }
+        return self.templates["personal"].new(
+            applicantName=personal_info.get("name", ""),
+            genderId=self._find_master_id("gender", personal_info.get("gender", "")),
+            dateOfBirth=self._format_date(personal_info.get("date_of_birth")),
+            emailId=personal_info.get("email", ""),
+            mobileNo=personal_info.get("phone", ""),
+            aadharNo=personal_info.get("aadhar_no"),
+            maritalStatusId=self._find_master_id("marital_status", personal_info.get("marital_status", "")),
+            nationalityId=self._find_master_id("country", personal_info.get("nationality", "India")),
+            passportNo=personal_info.get("passport_no"),
+            religionId=self._find_master_id("religion", personal_info.get("religion", "")),
+            bloodGroupId=self._find_master_id("blood_group", personal_info.get("blood_group", "")),
+            orcidNo=personal_info.get("orcid_no"),
+            scopusNo=personal_info.get("scopus_no")
+        )
     
     def _map_address_data(self, personal_info: Dict[str, Any]) -> Dict[str, Any]:
         """Map address information to DTO"""
         address = personal_info.get("address", "")
-        return {
-            "empApplnPersonalDataId": 0,
-            "empApplnEntriesId": 0,
-            "applicantName": None,
-            "genderId": None,
-            "fatherName": None,
-            "motherName": None,
-            "dateOfBirth": None,
-            "emailId": None,
-            "mobileNoCountryCode": None,
-            "mobileNo": None,
-            "alternateNo": None,
-            "aadharNo": None,
-            "maritalStatusId": None,
-            "nationalityId": None,
-            "passportNo": None,
-            "religionId": None,
-            "isMinority": None,
-            "reservationCategoryId": None,
-            "bloodGroupId": None,
-            "isDifferentlyAbled": None,
-            "differentlyAbledId": None,
-            "differentlyAbledDetails": None,
-            "currentAddressLine1": address,
-            "currentAddressLine2": None,
-            "currentCountryId": "1",  # Default to India
-            "currentStateId": None,
-            "currentStateOthers": None,
-            "currentCityId": None,
-            "currentCityOthers": None,
-            "currentPincode": None,
-            "isPermanentEqualsCurrent": "Yes",
-            "permanentAddressLine1": address,
-            "permanentAddressLine2": None,
-            "permanentCountryId": "1",  # Default to India
-            "permanentStateId": None,
-            "permanentStateOthers": None,
-            "permanentCityId": None,
-            "permanentCityOthers": None,
-            "permanentPincode": None,
-            "profilePhotoUrl": None,
-            "isUanNo": None,
-            "uanNo": None,
-            "highestQualificationLevel": None,
-            "originalFileName": None,
-            "uniqueFileName": None,
-            "newFile": None,
-            "processCode": None,
-            "actualPath": None,
-            "tempPath": None,
-            "orcidNo": None,
-            "vidwanNo": None,
-            "scopusNo": None,
-            "resumeUploadDTO": None,
-            "resumeUrl": None,
-            "hindexNo": None
-        }
+        pincode = personal_info.get("pincode")
+        return self.templates["address"].new(
+            currentAddressLine1=address,
+            currentPincode=pincode,
+            permanentAddressLine1=address,
+            permanentPincode=pincode
+        )
     
     def _map_education_data(self, education: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Map education data to DTO"""
         if not education:
-            return {
-                "highestQualificationLevelId": None,
-                "highestQualificationAlbum": None,
-                "highestQualification": None,
-                "qualificationLevelsList": [],
-                "eligibilityTestList": None,
-                "otherQualificationLevelsList": None,
-                "empEducationalDetailsMap": {},
-                "eligibilityTestDetails": None,
-                "empEducationalDetailsDTOS": None,
-                "studentEducationalDetailsDTOList": None
-            }
+            return self.templates["education"].new()
         
         # Find highest qualification
         highest_level = self._find_highest_qualification(education)
         
+        qualification = self.templates["qualification"]
         qualification_levels = []
         for i, edu in enumerate(education):
-            qualification_levels.append({
-                "empApplnEducationalDetailsId": 0,
-                "empApplnEntriesId": 0,
-                "qualificationName": None,
-                "qualificationLevelId": self._map_qualification_level(edu.get("qualification_level", "")),
-                "qualificationOthers": None,
-                "currentStatus": self._get_current_status(edu.get("current_status", edu.get("year_of_completion", ""))),
-                "course": self._normalize_course_name(edu.get("course", ""), edu.get("qualification_level", "")),
-                "specialization": edu.get("specialization", ""),
-                "yearOfCompletion": self._extract_year_from_completion(edu.get("year_of_completion", "")),
-                "gradeOrPercentage": edu.get("grade_or_percentage", ""),
-                "institute": edu.get("institute", ""),
-                "boardOrUniversity": edu.get("board_or_university", ""),
-                "documentList": [],
-                "qualificationLevelName": None,
-                "countryId": self._find_master_id("country", edu.get("country", "India")),
-                "stateId": self._find_master_id("state", edu.get("state", "")),
-                "stateOther": None,
-                "erpInstitute": None,
-                "erpBoardOrUniversity": None,
-                "qualificationLevelCode": None,
-                "countryName": None,
-                "stateName": None
-            })
-        
-        return {
-            "highestQualificationLevelId": highest_level,
-            "highestQualificationAlbum": None,
-            "highestQualification": None,
-            "qualificationLevelsList": qualification_levels,
-            "eligibilityTestList": None,
-            "otherQualificationLevelsList": None,
-            "empEducationalDetailsMap": {},
-            "eligibilityTestDetails": None,
-            "empEducationalDetailsDTOS": None,
-            "studentEducationalDetailsDTOList": None
-        }
+            qualification_levels.append(qualification.new(
+                qualificationLevelId=self._map_qualification_level(edu.get("qualification_level", "")),
+                currentStatus=self._get_current_status(edu.get("current_status", edu.get("year_of_completion", ""))),
+                course=self._normalize_course_name(edu.get("course", ""), edu.get("qualification_level", "")),
+                specialization=edu.get("specialization", ""),
+                yearOfCompletion=self._extract_year_from_completion(edu.get("year_of_completion", "")),
+                gradeOrPercentage=edu.get("grade_or_percentage", ""),
+                institute=edu.get("institute", ""),
+                boardOrUniversity=edu.get("board_or_university", ""),
+                countryId=self._find_master_id("country", edu.get("country", "India")),
+                stateId=self._find_master_id("state", edu.get("state", ""))
+            ))
+        
+        return self.templates["education"].new(
+            highestQualificationLevelId=highest_level,
+            qualificationLevelsList=qualification_levels
+        )
     
     def _map_work_experience(self, work_exp: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Map work experience data to DTO"""
         if not work_exp:
-            return {
-                "isCurrentlyWorking": "No",
-                "currentExperience": None,
-                "professionalExperienceList": None,
-                "totalPreviousExperienceYears": "0",
-                "totalPreviousExperienceMonths": "0",
-                "totalPartTimePreviousExperienceYears": "0",
-                "totalPartTimePreviousExperienceMonths": "0",
-                "recognisedExpYears": None,
-                "recognisedExpMonths": None,
-                "fullTimeYears": None,
-                "fullTimeMonths": None,
-                "partTimeYears": None,
-                "partTimeMonths": None,
-                "majorAchievements": None,
-                "expectedSalary": None,
-                "experienceInformation": None,
-                "majorAchievementsList": None
-            }
+            return self.templates["work_experience"].new()
         
         # Find current experience (most recent or marked as current)
         current_exp = None
@@ -352,75 +297,35 @@ class DTOMapper:
         
         current_experience_dto = None
         if current_exp:
-            current_experience_dto = {
-                "empApplnWorkExperienceId": 0,
-                "empApplnEntriesId": 0,
-                "workExperienceTypeId": "2",  # Default
-                "functionalAreaId": "13",  # Default
-                "functionalAreaOthers": None,
-                "employmentType": current_exp.get("employment_type", "fulltime"),
-                "designation": current_exp.get("designation", ""),
-                "years": str(self._calculate_years_from_dates(current_exp.get("from_date"), current_exp.get("to_date"))),
-                "months": str(self._calculate_months_from_dates(current_exp.get("from_date"), current_exp.get("to_date"))),
-                "noticePeriod": str(current_exp.get("notice_period", 30)),
-                "currentSalary": str(current_exp.get("current_salary", 0)),
-                "institution": current_exp.get("company", ""),
-                "experienceDocumentList": [],
-                "functionalArea": None,
-                "fromDate": self._parse_date_array(current_exp.get("from_date")),
-                "toDate": self._parse_date_array(current_exp.get("to_date"), is_current=True if current_exp.get("to_date", "").lower() in ["present", "current"] else False),
-                "isPartTime": None,
-                "isCurrentExperience": None
-            }
-        
-        return {
-            "isCurrentlyWorking": "Yes" if current_exp else "No",
-            "currentExperience": current_experience_dto,
-            "professionalExperienceList": None,
-            "totalPreviousExperienceYears": str(total_years),
-            "totalPreviousExperienceMonths": str(total_months),
-            "totalPartTimePreviousExperienceYears": "0",
-            "totalPartTimePreviousExperienceMonths": "0",
-            "recognisedExpYears": None,
-            "recognisedExpMonths": None,
-            "fullTimeYears": None,
-            "fullTimeMonths": None,
-            "partTimeYears": None,
-            "partTimeMonths": None,
-            "majorAchievements": None,
-            "expectedSalary": None,
-            "experienceInformation": None,
-            "majorAchievementsList": None
-        }
+            current_experience_dto = self.templates["current_experience"].new(
+                employmentType=current_exp.get("employment_type", "fulltime"),
+                designation=current_exp.get("designation", ""),
+                years=str(self._calculate_years_from_dates(current_exp.get("from_date"), current_exp.get("to_date"))),
+                months=str(self._calculate_months_from_dates(current_exp.get("from_date"), current_exp.get("to_date"))),
+                noticePeriod=str(current_exp.get("notice_period", 30)),
+                currentSalary=str(current_exp.get("current_salary", 0)),
+                institution=current_exp.get("company", ""),
+                fromDate=self._parse_date_array(current_exp.get("from_date")),
+                toDate=self._parse_date_array(current_exp.get("to_date"), is_current=True if current_exp.get("to_date", "").lower() in ["present", "current"] else False)
+            )
+        
+        return self.templates["work_experience"].new(
+            isCurrentlyWorking="Yes" if current_exp else "No",
+            currentExperience=current_experience_dto,
+            totalPreviousExperienceYears=str(total_years),
+            totalPreviousExperienceMonths=str(total_months)
+        )
     
     def _map_research_experience(self, research_info: Dict[str, Any]) -> Dict[str, Any]:
         """Map research experience to DTO"""
         has_research = research_info.get("has_research", False)
         
-        return {
-            "isResearchExperience": "Yes" if has_research else "No",
-            "inflibnetVidwanNo": None,
-            "scopusId": None,
-            "hIndex": None,
-            "researchEntries": {
-                "empApplnAddtnlInfoEntriesId": None,
-                "isResearchExperience": "Yes" if has_research else "No",
-                "researchEntriesHeadings": None,
-                "entriesId": None,
-                "parameterId": None,
-                "addtnlInfoValue": None
-            },
-            "isInterviewedBefore": "No",
-            "interviewedBeforeDepartment": None,
-            "interviewedBeforeYear": None,
-            "interviewedBeforeApplicationNo": None,
-            "interviewedBeforeSubject": None,
-            "vacancyInformationId": "5",
-            "aboutVacancyOthers": None,
-            "otherInformation": None,
-            "orcidId": None,
-            "hindex": None
-        }
+        return self.templates["research"].new(
+            isResearchExperience="Yes" if has_research else "No",
+            researchEntries=self.templates["research_entries"].new(
+                isResearchExperience="Yes" if has_research else "No"
+            )
+        )
     
     def _map_additional_info(self, additional_info: Dict[str, Any]) -> Dict[str, Any]:
         """Map additional information to DTO"""
@@ -476,21 +381,48 @@ class DTOMapper:
     
     def _find_master_id(self, category: str, value: str) -> str:
         """Find master data ID for a given category and value"""
-        if not value or category not in self.master_data:
-            return "1"  # Default ID
+        return self._match_master(category, value)[0]
+    
+    def _match_master(self, category: str, value: str) -> Tuple[str, float]:
+        """Find master data ID and match confidence (0.0 - 1.0) for a value"""
+        if not value or category not in self.master_indexes:
+            return "1", 0.0  # Default ID
         
         # Convert value to string and handle None/empty values
         value_str = str(value).strip() if value is not None else ""
         if not value_str:
-            return "1"  # Default ID
-        
-        values = self.master_data[category].get("values", [])
-        for item in values:
-            item_name = str(item.get("name", "")).strip()
-            if value_str.lower() in item_name.lower():
-                return str(item.get("id", 1))
+            return "1", 0.0  # Default ID
+        
+        # First row whose name contains the value
+        index = self.master_indexes[category]
+        master_id = index.find(value_str.lower())
+        if master_id is not None:
+            MASTER_MATCHES.labels(category, "exact").inc()
+            return master_id, 1.0
+        
+        # Closest names by trigram similarity
+        candidates = index.fuzzy_find(value_str, self.fuzzy_top_k)
+        if candidates and candidates[0][2] >= self.fuzzy_min_score:
+            master_id, confidence = candidates[0][0], candidates[0][2]
+        else:
+            master_id, confidence = "1", 0.0  # Default ID
+        MASTER_MATCHES.labels(category, "fuzzy" if confidence else "default").inc()
+        
+        report = _match_report.get()
+        if report is not None:
+            report.append({
+                "category": category,
+                "value": value_str,
+                "id": master_id,
+                "confidence": confidence,
+                "defaulted": confidence == 0.0,
+                "candidates": [
+                    {"id": candidate_id, "name": name, "confidence": score}
+                    for candidate_id, name, score in candidates
+                ]
+            })
         
-        return "1"  # Default ID
+        return master_id, confidence
     
     def _map_qualification_level(self, level: str) -> str:
         """Map qualification level to ID"""
@@ -571,39 +503,15 @@ class DTOMapper:
     
     def _calculate_experience_from_dates(self, from_date: str, to_date: str) -> tuple:
         """Calculate years and months from date strings"""
-        try:
-            from datetime import datetime
-            
-            # Parse from_date
-            from_dt = None
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    from_dt = datetime.strptime(from_date, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            # Parse to_date
-            to_dt = None
-            if to_date.lower() in ["present", "current"]:
-                to_dt = datetime.now()
-            else:
-                for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                    try:
-                        to_dt = datetime.strptime(to_date, fmt)
-                        break
-                    except ValueError:
-                        continue
-            
-            if from_dt and to_dt:
-                # Calculate difference
-                delta = to_dt - from_dt
-                years = delta.days // 365
-                months = (delta.days % 365) // 30
-                return years, months
-                
-        except Exception:
-            pass
+        from_dt = _parse_date(from_date)
+        to_dt = _resolve_end_date(to_date)
+        
+        if from_dt and to_dt:
+            # Calculate difference
+            delta = to_dt - from_dt
+            years = delta.days // 365
+            months = (delta.days % 365) // 30
+            return years, months
         
         return 0, 0
     
@@ -644,78 +552,29 @@ class DTOMapper:
     
     def _calculate_years_from_dates(self, from_date: str, to_date: str) -> int:
         """Calculate years from date strings"""
-        try:
-            from datetime import datetime
-            
-            # Parse from_date
-            from_dt = None
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    from_dt = datetime.strptime(from_date, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            # Parse to_date
-            to_dt = None
-            if to_date and to_date.lower() in ["present", "current"]:
-                to_dt = datetime.now()
-            elif to_date:
-                for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                    try:
-                        to_dt = datetime.strptime(to_date, fmt)
-                        break
-                    except ValueError:
-                        continue
-            
-            if from_dt and to_dt:
-                # Calculate difference
-                delta = to_dt - from_dt
-                years = delta.days // 365
-                return years
-                
-        except Exception:
-            pass
+        from_dt = _parse_date(from_date)
+        to_dt = _resolve_end_date(to_date)
+        
+        if from_dt and to_dt:
+            # Calculate difference
+            delta = to_dt - from_dt
+            return delta.days // 365
         
         return 0
     
     def _calculate_months_from_dates(self, from_date: str, to_date: str) -> int:
         """Calculate months from date strings"""
-        try:
-            from datetime import datetime
-            
-            # Parse from_date
-            from_dt = None
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    from_dt = datetime.strptime(from_date, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            # Parse to_date
-            to_dt = None
-            if to_date and to_date.lower() in ["present", "current"]:
-                to_dt = datetime.now()
-            elif to_date:
-                for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                    try:
-                        to_dt = datetime.strptime(to_date, fmt)
-                        break
-                    except ValueError:
-                        continue
-            
-            if from_dt and to_dt:
-                # Calculate difference
-                delta = to_dt - from_dt
-                total_months = (to_dt.year - from_dt.year) * 12 + (to_dt.month - from_dt.month)
-                # Subtract the years already counted
-                years = delta.days // 365
-                months = total_months - (years * 12)
-                return max(0, months)
-                
-        except Exception:
-            pass
+        from_dt = _parse_date(from_date)
+        to_dt = _resolve_end_date(to_date)
+        
+        if from_dt and to_dt:
+            # Calculate difference
+            delta = to_dt - from_dt
+            total_months = (to_dt.year - from_dt.year) * 12 + (to_dt.month - from_dt.month)
+            # Subtract the years already counted
+            years = delta.days // 365
+            months = total_months - (years * 12)
+            return max(0, months)
         
         return 0
     
@@ -724,16 +583,9 @@ class DTOMapper:
         if not date_str:
             return None
         
-        try:
-            # Try different date formats
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    parsed_date = datetime.strptime(date_str, fmt).date()
-                    return parsed_date.isoformat() + "T18:30:00.000Z"
-                except ValueError:
-                    continue
-        except:
-            pass
+        parsed_date = _parse_date(date_str)
+        if parsed_date:
+            return parsed_date.date().isoformat() + "T18:30:00.000Z"
         
         return None
     
@@ -781,21 +633,14 @@ class DTOMapper:
     
     def _parse_date_array(self, date_str: str, is_current: bool = False) -> List[int]:
         """Parse date string to [year, month, day] array"""
-        if not date_str or date_str.lower() in ["present", "current"]:
+        if not date_str or str(date_str).strip().lower() in ONGOING_DATES:
             return None  # Return null for ongoing positions
         
-        try:
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    parsed_date = datetime.strptime(date_str, fmt).date()
-                    return [parsed_date.year, parsed_date.month, parsed_date.day]
-                except ValueError:
-                    continue
-        except:
-            pass
+        parsed_date = _parse_date(date_str)
+        if parsed_date:
+            return [parsed_date.year, parsed_date.month, parsed_date.day]
         
         # Try to extract year from string
-        import re
         year_match = re.search(r'\b(20\d{2}|19\d{2})\b', str(date_str))
         if year_match:
             year = int(year_match.group(1))
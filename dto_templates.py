@@ -0,0 +1,138 @@
+import copy
+import json
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+# Where each template's keys live in dto.json; list indexes pick an example row
+SCHEMA_PATHS = {
+    "base": (),
+    "job_detail": ("jobDetailDTO",),
+    "personal": ("empApplnPersonalDataDTO",),
+    "address": ("addressDetailDTO",),
+    "education": ("educationalDetailDTO",),
+    "qualification": ("educationalDetailDTO", "qualificationLevelsList", 0),
+    "work_experience": ("professionalExperienceDTO",),
+    "current_experience": ("professionalExperienceDTO", "currentExperience"),
+    "research": ("researchDetailDTO",),
+    "research_entries": ("researchDetailDTO", "researchEntries"),
+}
+
+# Values the mapper always emits unless a field is filled from the resume;
+# every other schema key defaults to None
+TEMPLATE_DEFAULTS = {
+    "base": {
+        "empApplnEntriesId": 0,
+        "saveMode": "save draft",
+        "empApplnPersonalDataDTO": {},
+        "addressDetailDTO": {},
+        "educationalDetailDTO": {},
+        "professionalExperienceDTO": {},
+        "academic": False,
+    },
+    "job_detail": {
+        "empApplnEntriesId": 0,
+        "postAppliedFor": "1",
+        "subjectCategoryIds": [[]],
+        "empApplnSubjectCategoryDTO": [],
+        "preferredLocationIds": [],
+    },
+    "personal": {
+        "empApplnPersonalDataId": 0,
+        "empApplnEntriesId": 0,
+        "mobileNoCountryCode": "+91",  # Default for India
+        "isMinority": "No",
+        "reservationCategoryId": "3",
+        "isDifferentlyAbled": "No",
+        "newFile": False,
+    },
+    "address": {
+        "empApplnPersonalDataId": 0,
+        "empApplnEntriesId": 0,
+        "currentCountryId": "1",  # Default to India
+        "isPermanentEqualsCurrent": "Yes",
+        "permanentCountryId": "1",  # Default to India
+    },
+    "education": {
+        "qualificationLevelsList": [],
+        "empEducationalDetailsMap": {},
+    },
+    "qualification": {
+        "empApplnEducationalDetailsId": 0,
+        "empApplnEntriesId": 0,
+        "documentList": [],
+    },
+    "work_experience": {
+        "isCurrentlyWorking": "No",
+        "totalPreviousExperienceYears": "0",
+        "totalPreviousExperienceMonths": "0",
+        "totalPartTimePreviousExperienceYears": "0",
+        "totalPartTimePreviousExperienceMonths": "0",
+    },
+    "current_experience": {
+        "empApplnWorkExperienceId": 0,
+        "empApplnEntriesId": 0,
+        "workExperienceTypeId": "2",
+        "functionalAreaId": "13",
+        "experienceDocumentList": [],
+    },
+    "research": {
+        "isResearchExperience": "No",
+        "isInterviewedBefore": "No",
+        "vacancyInformationId": "5",
+    },
+    "research_entries": {},
+}
+
+
+class DTOTemplate:
+    """
+    Frozen DTO section compiled from the schema: every key in schema order
+    with its default value. new() returns a fresh dict with only the given
+    fields overridden, instead of rebuilding the whole literal each time.
+    """
+
+    __slots__ = ("name", "keys", "_base", "_containers")
+
+    def __init__(self, name: str, keys: List[str], defaults: Dict[str, Any]):
+        unknown = set(defaults) - set(keys)
+        if unknown:
+            raise ValueError(f"DTO template '{name}' has defaults for keys missing from dto.json: {sorted(unknown)}")
+
+        base = dict.fromkeys(keys)
+        base.update(defaults)
+        self.name = name
+        self.keys = tuple(keys)
+        self._base = MappingProxyType(base)
+        # Container defaults must not be shared between DTOs
+        self._containers = tuple(key for key, value in base.items() if isinstance(value, (dict, list)))
+
+    def new(self, **fields: Any) -> Dict[str, Any]:
+        """Return a new DTO section with fields filled in"""
+        record = self._base.copy()
+        for key in self._containers:
+            if key not in fields:
+                value = record[key]
+                record[key] = copy.deepcopy(value) if value else type(value)()
+        record.update(fields)
+        return record
+
+
+def _schema_section(schema: Dict[str, Any], path: tuple) -> Dict[str, Any]:
+    section = schema
+    for step in path:
+        section = section[step]
+    if not isinstance(section, dict):
+        raise ValueError(f"dto.json section {'/'.join(map(str, path))} is not an object")
+    return section
+
+
+def compile_templates(schema_path: str = "dto.json", schema: Optional[Dict[str, Any]] = None) -> Dict[str, DTOTemplate]:
+    """Compile every DTO template once from the dto.json schema"""
+    if schema is None:
+        with open(schema_path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+
+    return {
+        name: DTOTemplate(name, list(_schema_section(schema, path)), TEMPLATE_DEFAULTS[name])
+        for name, path in SCHEMA_PATHS.items()
+    }
@@ -0,0 +1,104 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class ExtractionPoolFull(Exception):
+    """Raised when the extraction queue is at capacity"""
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a document takes longer than the per-document timeout"""
+
+
+class ExtractionPool:
+    """
+    Runs CPU-bound text extraction in a pool of worker processes so PyPDF2 and
+    python-docx never block the event loop
+    """
+
+    def __init__(self):
+        self.max_workers = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+        self.queue_depth = int(os.getenv("EXTRACTION_QUEUE_DEPTH", "32"))
+        self.timeout = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+        self.max_jobs_per_worker = int(os.getenv("EXTRACTION_MAX_JOBS_PER_WORKER", "100"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs_in_generation = 0
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of documents running or waiting at once"""
+        return max(self.max_workers, 1) + self.queue_depth
+
+    async def run(self, func: Callable[..., Any], *args: Any, in_process: bool = False) -> Any:
+        """
+        Run func(*args) in the pool, enforcing queue depth and timeout.
+        in_process runs it in a thread of this process instead (e.g. so a
+        profiler can see it).
+        """
+        if self._pending >= self.capacity:
+            raise ExtractionPoolFull(
+                f"Extraction queue is full ({self.capacity} documents in progress)"
+            )
+
+        self._pending += 1
+        try:
+            try:
+                return await self._submit(func, *args, in_process=in_process)
+            except BrokenProcessPool:
+                # The generation was torn down under us (e.g. a sibling job timed
+                # out), so retry once on a fresh set of workers
+                return await self._submit(func, *args)
+        finally:
+            self._pending -= 1
+
+    async def _submit(self, func: Callable[..., Any], *args: Any, in_process: bool = False) -> Any:
+        loop = asyncio.get_running_loop()
+
+        if self.max_workers <= 0 or in_process:
+            # In-process mode: keep the loop free with a thread, no isolation
+            future = loop.run_in_executor(None, func, *args)
+            executor = None
+        else:
+            executor = self._get_executor()
+            future = loop.run_in_executor(executor, func, *args)
+
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            if executor is not None:
+                self._retire(executor, terminate=True)
+            raise ExtractionTimeout(f"Text extraction timed out after {self.timeout:g} seconds")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the current executor, recycling workers after N jobs each"""
+        if self._executor is not None and self._jobs_in_generation >= self.max_workers * self.max_jobs_per_worker:
+            self._retire(self._executor)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._jobs_in_generation = 0
+
+        self._jobs_in_generation += 1
+        return self._executor
+
+    def _retire(self, executor: ProcessPoolExecutor, terminate: bool = False):
+        """Stop sending work to an executor; its workers exit once idle"""
+        if executor is self._executor:
+            self._executor = None
+
+        if terminate:
+            # A stuck parser never returns on its own, so kill the processes
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+
+        executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """Shut down worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,218 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# personal_info fields that can be read from the text without the LLM
+FAST_FIELDS = ("email", "phone", "aadhar_no", "passport_no", "date_of_birth", "pincode", "orcid_no", "scopus_no")
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+# Indian mobile numbers, with or without country code / trunk prefix
+_MOBILE = re.compile(r"(?<![\d+])(?:(?:\+|00)91[\s-]?|0)?[6-9]\d{4}[\s-]?\d{5}(?!\d)")
+# Any other number written after a phone label
+_LABELLED_PHONE = re.compile(
+    r"\b(?:phone|mobile|mob|cell|contact|tel|telephone|whatsapp)\b[^\d+]{0,20}(\+?\d[\d\s()-]{7,18}\d)", re.IGNORECASE
+)
+# Lines about other identifiers, whose numbers must not be taken for an unlabelled phone
+_OTHER_ID_LABEL = re.compile(r"\b(?:scopus|orcid|aadha+r|uid|passport|pin|isbn|issn|doi|h-index)\b", re.IGNORECASE)
+_AADHAAR = re.compile(r"(?<!\d)([2-9]\d{3})[\s-]?(\d{4})[\s-]?(\d{4})(?!\d)")
+_PASSPORT = re.compile(r"\bpassport\b[^A-Za-z0-9]{0,5}(?:no\.?|number|#)?[^A-Za-z0-9]{0,5}([A-Z][\s-]?\d{7})\b", re.IGNORECASE)
+_DOB_LABEL = re.compile(r"\b(?:date\s+of\s+birth|d\.?\s?o\.?\s?b\.?|born\s+on|birth\s+date)\b[^A-Za-z0-9]{0,5}(.{6,30})", re.IGNORECASE)
+_PINCODE_LABEL = re.compile(r"\b(?:pin\s*code|pin|postal\s+code|zip\s*code)\b[^0-9]{0,5}([1-9]\d{2}\s?\d{3})(?!\d)", re.IGNORECASE)
+# "Bengaluru - 560001" / "Karnataka 560001," at the end of an address line
+_PINCODE_TRAILING = re.compile(r"[A-Za-z][\s,.-]+([1-9]\d{2}\s?\d{3})[\s.,)]*$")
+_ORCID = re.compile(r"(?<![\d-])(\d{4}-\d{4}-\d{4}-\d{3}[\dX])(?![\d-])")
+_SCOPUS = re.compile(r"\bscopus\b[^0-9]{0,30}(\d{10,11})(?!\d)", re.IGNORECASE)
+
+_NUMERIC_DATE = re.compile(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})(?!\d)")
+_ISO_DATE = re.compile(r"(\d{4})[./-](\d{1,2})[./-](\d{1,2})(?!\d)")
+_DAY_MONTH_YEAR = re.compile(r"(\d{1,2})(?:st|nd|rd|th)?[\s-]+([A-Za-z]{3,9})\.?,?[\s-]+(\d{4}|\d{2})(?!\d)")
+_MONTH_DAY_YEAR = re.compile(r"([A-Za-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})")
+_MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+
+# Labels in front of the fields above; a line holding nothing else can be dropped from the prompt
+_LABELS = re.compile(
+    r"\b(?:e-?mail(?:\s+id)?|phone|mobile|mob|cell|contact|tel|telephone|whatsapp|aadha+r|uid|passport|date\s+of\s+birth"
+    r"|d\.?\s?o\.?\s?b|born\s+on|birth\s+date|pin\s*code|pin|postal\s+code|zip\s*code|orcid|scopus|author|id|no|number)\b\.?",
+    re.IGNORECASE,
+)
+_RESIDUE = re.compile(r"[\W_]+")
+_NAME = re.compile(r"[A-Z][A-Za-z.'-]*(?:\s+[A-Z][A-Za-z.'-]*){1,4}")
+_NOT_A_NAME = re.compile(r"\b(?:resume|curriculum|vitae|cv|bio.?data|profile)\b", re.IGNORECASE)
+
+# Verhoeff tables for the Aadhaar check digit
+_VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 2, 3, 4, 0, 6, 7, 8, 9, 5), (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7), (4, 0, 1, 2, 3, 9, 5, 6, 7, 8), (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2), (7, 6, 5, 9, 8, 2, 1, 0, 4, 3), (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+_VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 5, 7, 6, 2, 8, 3, 0, 9, 4), (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7), (9, 4, 5, 3, 1, 2, 6, 8, 7, 0), (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5), (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+
+def _verhoeff_valid(number: str) -> bool:
+    check = 0
+    for position, digit in enumerate(reversed(number)):
+        check = _VERHOEFF_D[check][_VERHOEFF_P[position % 8][int(digit)]]
+    return check == 0
+
+
+def _orcid_valid(orcid: str) -> bool:
+    """ISO 7064 MOD 11-2 check digit of an ORCID iD"""
+    digits = orcid.replace("-", "")
+    total = 0
+    for digit in digits[:-1]:
+        total = (total + int(digit)) * 2
+    result = (12 - total % 11) % 11
+    return digits[-1] == ("X" if result == 10 else str(result))
+
+
+def _date(year: int, month: int, day: int) -> Optional[str]:
+    if year < 100:
+        year += 1900 if year > datetime.now().year % 100 else 2000
+    try:
+        return datetime(year, month, day).date().isoformat()
+    except ValueError:
+        return None
+
+
+def _find_date(value: str) -> Tuple[Optional[str], str]:
+    """First written date in value as (YYYY-MM-DD, matched text)"""
+    match = _ISO_DATE.search(value)
+    if match:
+        return _date(int(match.group(1)), int(match.group(2)), int(match.group(3))), match.group(0)
+
+    match = _NUMERIC_DATE.search(value)
+    if match:
+        first, second, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+        date = _date(year, second, first) if second <= 12 else _date(year, first, second)
+        return date, match.group(0)
+
+    match = _DAY_MONTH_YEAR.search(value)
+    if match and match.group(2)[:3].lower() in _MONTHS:
+        return _date(int(match.group(3)), _MONTHS[match.group(2)[:3].lower()], int(match.group(1))), match.group(0)
+
+    match = _MONTH_DAY_YEAR.search(value)
+    if match and match.group(1)[:3].lower() in _MONTHS:
+        return _date(int(match.group(3)), _MONTHS[match.group(1)[:3].lower()], int(match.group(2))), match.group(0)
+    return None, ""
+
+
+def parse_date_text(value: str) -> Optional[str]:
+    """
+    Read a written date as YYYY-MM-DD. Numeric dates are day first
+    (12/04/1991 is 12 April) unless that is impossible.
+    """
+    return _find_date(value)[0]
+
+
+def _find_fields(lines: List[str]) -> Dict[str, Tuple[str, int, str]]:
+    """field -> (value, line index, matched text) for the first match of each field"""
+    found: Dict[str, Tuple[str, int, str]] = {}
+
+    def first(field: str, index: int, value: Optional[str], raw: str):
+        if value and field not in found:
+            found[field] = (value, index, raw)
+
+    for index, line in enumerate(lines):
+        match = _EMAIL.search(line)
+        if match:
+            first("email", index, match.group(0).lower(), match.group(0))
+
+        for match in _AADHAAR.finditer(line):
+            number = "".join(match.groups())
+            if _verhoeff_valid(number):
+                first("aadhar_no", index, " ".join(match.groups()), match.group(0))
+
+        match = _LABELLED_PHONE.search(line) or (not _OTHER_ID_LABEL.search(line) and _MOBILE.search(line))
+        if match:
+            raw = match.group(match.lastindex or 0)
+            digits = re.sub(r"\D", "", raw)
+            is_aadhaar = "aadhar_no" in found and found["aadhar_no"][0].replace(" ", "") == digits
+            if 10 <= len(digits) <= 14 and not is_aadhaar:
+                first("phone", index, re.sub(r"\s+", " ", raw.strip()), raw)
+
+        match = _PASSPORT.search(line)
+        if match:
+            first("passport_no", index, re.sub(r"[\s-]", "", match.group(1)).upper(), match.group(1))
+
+        match = _DOB_LABEL.search(line)
+        if match:
+            first("date_of_birth", index, *_find_date(match.group(1)))
+
+        match = _PINCODE_LABEL.search(line) or _PINCODE_TRAILING.search(line)
+        if match and not _MOBILE.search(line):
+            first("pincode", index, match.group(1).replace(" ", ""), match.group(1))
+
+        match = _ORCID.search(line)
+        if match and _orcid_valid(match.group(1)):
+            first("orcid_no", index, match.group(1), match.group(1))
+
+        match = _SCOPUS.search(line)
+        if match:
+            first("scopus_no", index, match.group(1), match.group(1))
+    return found
+
+
+def extract_personal_fields(text: str) -> Dict[str, str]:
+    """Read the FAST_FIELDS found in the text; fields not found are left out"""
+    return {field: value for field, (value, _, _) in _find_fields(text.split("\n")).items()}
+
+
+def prefill_text(text: str) -> Tuple[str, Dict[str, str], int]:
+    """
+    Extract the FAST_FIELDS and drop the lines that hold nothing but those
+    fields and their labels, so the LLM prompt is shorter.
+    Returns the remaining text, the fields and the number of lines removed.
+    """
+    lines = text.split("\n")
+    found = _find_fields(lines)
+
+    matched: Dict[int, List[str]] = {}
+    for _, index, raw in found.values():
+        matched.setdefault(index, []).append(raw)
+
+    removed = set()
+    for index, raws in matched.items():
+        residue = lines[index]
+        for raw in raws:
+            residue = residue.replace(raw, " ")
+        if not _RESIDUE.sub("", _LABELS.sub(" ", residue)):
+            removed.add(index)
+
+    kept = [line for index, line in enumerate(lines) if index not in removed]
+    fields = {field: value for field, (value, _, _) in found.items()}
+    return "\n".join(kept), fields, len(removed)
+
+
+def guess_name(text: str) -> Optional[str]:
+    """The first short line that looks like a person's name (resumes usually open with it)"""
+    for line in text.split("\n")[:10]:
+        line = line.strip()
+        if _NAME.fullmatch(line) and not _NOT_A_NAME.search(line):
+            return line
+    return None
+
+
+def _same_value(field: str, local: str, llm: str) -> bool:
+    if field in ("phone", "aadhar_no", "pincode"):
+        return re.sub(r"\D", "", local)[-10:] == re.sub(r"\D", "", llm)[-10:]
+    return local.strip().lower() == llm.strip().lower()
+
+
+def merge_personal_fields(personal_info: Dict[str, str], fields: Dict[str, str]) -> List[str]:
+    """
+    Fill personal_info with locally extracted fields, overriding what the LLM
+    returned. Returns the fields where the LLM value was present but different.
+    """
+    overridden = []
+    for field, value in fields.items():
+        current = personal_info.get(field)
+        if current and not _same_value(field, value, str(current)):
+            overridden.append(field)
+        personal_info[field] = value
+    return overridden
@@ -0,0 +1,239 @@
+"""
+Near-duplicate detection of resume text.
+
+A resume re-exported as PDF instead of DOCX, or uploaded again with a line
+changed, has a different file hash but almost the same text. Each structured
+resume is stored with two fingerprints of its normalized text:
+- a SHA-256 of the normalized words, matching re-exports exactly
+- a bottom-k MinHash of its word shingles, estimating the Jaccard similarity
+  of the shingle sets, so a lightly edited resume still matches
+
+Signature hashes are kept in SQLite in a covering (version, hash) index: the
+candidates for a new resume are the documents sharing the most hashes with
+it, and only those few are compared in full.
+"""
+import hashlib
+import heapq
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from text_preprocessing import PAGE_BREAK
+
+# Words per shingle; three keeps a one-word edit local to three shingles
+SHINGLE_WORDS = 3
+# Smallest shingle hashes kept per document (estimate error is about 1/sqrt(k))
+SIGNATURE_SIZE = 128
+# Documents sharing the most signature hashes that are compared in full
+CANDIDATES = 5
+
+_WORD = re.compile(r"\w+")
+
+
+class Fingerprint(NamedTuple):
+    text_sha256: str
+    signature: Tuple[int, ...]
+
+
+class NearDuplicate(NamedTuple):
+    document_id: int
+    similarity: float
+    exact: bool
+    extracted_data: Dict[str, Any]
+
+
+def fingerprint_text(text: str) -> Fingerprint:
+    """Fingerprints of resume text, ignoring case, punctuation, layout and page breaks"""
+    words = _WORD.findall(text.replace(PAGE_BREAK, " ").casefold())
+    text_sha256 = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))}
+    # 63-bit hashes fit SQLite's signed integers
+    hashes = {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+        for shingle in shingles
+    }
+    return Fingerprint(text_sha256, tuple(heapq.nsmallest(SIGNATURE_SIZE, hashes)))
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """
+    Jaccard similarity of two shingle sets estimated from their bottom-k
+    signatures: the share of the k smallest hashes of the union found in both
+    """
+    if not a or not b:
+        return 0.0
+    a, b = set(a), set(b)
+    union = heapq.nsmallest(SIGNATURE_SIZE, a | b)
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+def _pack(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(f">{len(signature)}q", *signature)
+
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f">{len(blob) // 8}q", blob)
+
+
+class FingerprintIndex:
+    """
+    SQLite store of structured resumes by text fingerprint. Entries are
+    grouped by a version string (prompt, structuring mode, model), so a
+    resume structured under other settings is never reused.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("NEAR_DUP_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.threshold = float(os.getenv("NEAR_DUP_THRESHOLD", "0.9"))
+        # Re-read personal fields of the new text with the local extractors
+        self.recheck = os.getenv("NEAR_DUP_RECHECK", "true").lower() in ("1", "true", "yes")
+        self.max_entries = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "20000"))
+        self.ttl = float(os.getenv("NEAR_DUP_TTL_SECONDS", str(30 * 24 * 3600)))
+        self.db_path = os.getenv("NEAR_DUP_DB_PATH", os.path.join("cache", "fingerprints.sqlite3"))
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.enabled:
+            self._open_db()
+
+    def _open_db(self):
+        """Open the SQLite store, creating it if needed"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                version TEXT NOT NULL,
+                text_sha256 TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                extracted_data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_documents_text ON documents (version, text_sha256)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_documents_accessed ON documents (accessed_at)")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signature_hashes (
+                version TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                document_id INTEGER NOT NULL,
+                PRIMARY KEY (version, hash, document_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_signature_document ON signature_hashes (document_id)")
+
+    def find(self, fingerprint: Fingerprint, version: str) -> Optional[NearDuplicate]:
+        """The stored resume most similar to fingerprint, if at or above the threshold"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, extracted_data FROM documents "
+                "WHERE version = ? AND text_sha256 = ? AND created_at > ? ORDER BY id DESC LIMIT 1",
+                (version, fingerprint.text_sha256, now - self.ttl),
+            ).fetchone()
+            if row is not None:
+                best = NearDuplicate(row[0], 1.0, True, json.loads(row[1]))
+            else:
+                best = self._closest(fingerprint.signature, version, now)
+            if best is not None:
+                self._db.execute("UPDATE documents SET accessed_at = ? WHERE id = ?", (now, best.document_id))
+        return best
+
+    def _closest(self, signature: Tuple[int, ...], version: str, now: float) -> Optional[NearDuplicate]:
+        if not signature:
+            return None
+        placeholders = ",".join("?" * len(signature))
+        candidates = self._db.execute(
+            f"""
+            SELECT d.id, d.signature, d.extracted_data
+            FROM (SELECT document_id, COUNT(*) AS shared FROM signature_hashes
+                  WHERE version = ? AND hash IN ({placeholders})
+                  GROUP BY document_id ORDER BY shared DESC LIMIT ?) AS s
+            JOIN documents AS d ON d.id = s.document_id
+            WHERE d.created_at > ?
+            """,
+            (version, *signature, CANDIDATES, now - self.ttl),
+        ).fetchall()
+
+        best = None
+        for document_id, blob, extracted_data in candidates:
+            score = similarity(signature, _unpack(blob))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (document_id, score, extracted_data)
+        if best is None:
+            return None
+        return NearDuplicate(best[0], round(best[1], 4), False, json.loads(best[2]))
+
+    def add(self, fingerprint: Fingerprint, version: str, extracted_data: Dict[str, Any]):
+        """Store a freshly structured resume under its fingerprints"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        blob = json.dumps(extracted_data, separators=(",", ":"))
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                document_id = self._db.execute(
+                    "INSERT INTO documents (version, text_sha256, signature, extracted_data, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (version, fingerprint.text_sha256, _pack(fingerprint.signature), blob, now, now),
+                ).lastrowid
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO signature_hashes (version, hash, document_id) VALUES (?, ?, ?)",
+                    [(version, h, document_id) for h in fingerprint.signature],
+                )
+                self._evict(now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float):
+        """Drop expired documents, then least recently used ones over max_entries"""
+        stale: List[Tuple[int]] = self._db.execute(
+            "SELECT id FROM documents WHERE created_at <= ?", (now - self.ttl,)
+        ).fetchall()
+        excess = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0] - len(stale) - self.max_entries
+        if self.max_entries and excess > 0:
+            stale += self._db.execute(
+                "SELECT id FROM documents WHERE created_at > ? ORDER BY accessed_at LIMIT ?",
+                (now - self.ttl, excess),
+            ).fetchall()
+        if stale:
+            self._db.executemany("DELETE FROM signature_hashes WHERE document_id = ?", stale)
+            self._db.executemany("DELETE FROM documents WHERE id = ?", stale)
+
+    def reopen(self):
+        """
+        Open a fresh connection in a forked worker process; SQLite connections
+        must not be shared across fork
+        """
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._open_db()
+
+    def close(self):
+        """Close the SQLite store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for production: several uvicorn workers forked from one
+preloaded application.
+
+    gunicorn -c gunicorn_conf.py main:app
+
+The app (master data, DTO templates, LLM client settings) is imported once in
+the master process. Every master-data category is unpacked and the heap is
+frozen out of the garbage collector before forking, so workers share those
+pages copy-on-write instead of each holding its own copy.
+"""
+import gc
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_WORKERS", "0")) or os.cpu_count() or 1
+preload_app = os.getenv("WEB_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# Recycle each worker after this many requests (jittered so they do not all
+# restart together) to contain memory growth in the parsing libraries
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = max(max_requests // 10, 1) if max_requests else 0
+
+# On SIGTERM or recycling, a worker stops accepting connections and finishes
+# the requests it has, including LLM calls, for up to graceful_timeout seconds
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", str(int(float(os.getenv("LLM_TIMEOUT", "60"))) + 30)))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before any worker is forked"""
+    app_module = sys.modules.get("main")
+    if preload_app and app_module is not None:
+        app_module.prepare_fork()
+    # Move everything allocated so far out of the collector's reach: a full
+    # collection in a worker would otherwise touch (and so copy) every page
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    app_module = sys.modules.get("main")
+    if preload_app and app_module is not None:
+        app_module.after_fork()
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import openai
+
+from extraction_pool import ExtractionPoolFull
+
+# Failures worth retrying: the same job may well succeed a little later
+TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ExtractionPoolFull,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+JobProcessor = Callable[[bytes, str], Awaitable[Tuple[Dict[str, Any], Dict[str, Any]]]]
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Check an exception and the exceptions it wraps for a transient failure"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class JobQueue:
+    """
+    Persistent parse-job queue backed by SQLite and drained by a pool of
+    asyncio workers inside the service.
+
+    Jobs are claimed with a lease, so work that was running when the process
+    stopped is picked up again once the lease expires after a restart.
+    """
+
+    def __init__(self, processor: JobProcessor):
+        self.processor = processor
+        self.db_path = os.getenv("JOB_DB_PATH", os.path.join("cache", "jobs.sqlite3"))
+        self.worker_count = int(os.getenv("JOB_WORKERS", "4"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.retry_delay = float(os.getenv("JOB_RETRY_DELAY", "5"))
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+        self.result_ttl = float(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._last_purge = 0.0
+        self._open_db()
+
+    def _open_db(self):
+        """Open the SQLite job store, creating it if needed"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                content BLOB,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                expires_at REAL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)")
+
+    def reopen(self):
+        """
+        Open a fresh connection in a forked worker process; SQLite connections
+        must not be shared across fork
+        """
+        self._lock = threading.Lock()
+        self._open_db()
+
+    def enqueue(self, file_content: bytes, filename: str) -> str:
+        """Persist a new job and wake a worker; returns the job id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, filename, content, created_at, updated_at, available_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, filename, file_content, now, now, now),
+            )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the public view of a job, or None if unknown or expired"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, filename, attempts, result, error, created_at, updated_at, expires_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+
+        if row is None or (row["expires_at"] is not None and row["expires_at"] <= time.time()):
+            return None
+
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if row["result"] is not None:
+            job.update(json.loads(row["result"]))
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def start(self):
+        """Start the worker pool on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """Stop the workers; claimed jobs are retried after their lease expires"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        with self._lock:
+            self._db.close()
+
+    async def _worker(self):
+        while True:
+            self._purge_expired()
+            job = self._claim()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Atomically lease the oldest runnable job"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, filename, content, attempts FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= self.max_attempts:
+                # Lease ran out on the final attempt (e.g. the process died)
+                claimed = None
+            else:
+                claimed = self._db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                    "WHERE id = ? AND attempts = ?",
+                    (now + self.lease_seconds, now, row["id"], row["attempts"]),
+                ).rowcount
+        if claimed is None:
+            self._finish(row["id"], status="failed", error=f"Job abandoned after {row['attempts']} attempts")
+            return None
+        return row if claimed else None
+
+    async def _run(self, job: sqlite3.Row):
+        attempts = job["attempts"] + 1
+        try:
+            dto, meta = await self.processor(job["content"], job["filename"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_transient_error(e) and attempts < self.max_attempts:
+                delay = self.retry_delay * (2 ** (attempts - 1))
+                self._update(job["id"], status="queued", error=str(e), available_at=time.time() + delay)
+            else:
+                self._finish(job["id"], status="failed", error=str(e))
+            return
+
+        result = json.dumps({"data": dto, "meta": meta})
+        self._finish(job["id"], status="completed", result=result)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        """Record a terminal state, drop the upload, and start the expiry clock"""
+        self._update(
+            job_id,
+            status=status,
+            result=result,
+            error=error,
+            content=None,
+            lease_until=None,
+            expires_at=time.time() + self.result_ttl,
+        )
+
+    def _update(self, job_id: str, **fields: Any):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _purge_expired(self):
+        """Delete finished jobs past their expiry, at most once a minute"""
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from text_preprocessing import estimate_tokens
+
+# Deterministic reply of the mock backend: a complete resume in the shape the
+# structuring prompts ask for. Each prompt gets the top-level keys it names.
+MOCK_RESPONSE = {
+    "personal_info": {
+        "name": "Asha Raman",
+        "email": "asha.raman@example.com",
+        "phone": "+91 98450 12345",
+        "address": "12 MG Road, Bengaluru, Karnataka 560001",
+        "date_of_birth": "1991-04-12",
+        "gender": "Female",
+        "marital_status": "Married",
+        "nationality": "Indian",
+        "religion": "Hindu",
+        "blood_group": "B+ve",
+        "aadhar_no": None,
+        "passport_no": None
+    },
+    "education": [
+        {"qualification_level": "PhD", "course": "Ph.D.", "specialization": "Physics", "institute": "IISc",
+         "board_or_university": "IISc", "year_of_completion": "2020", "current_status": None,
+         "grade_or_percentage": None, "country": "India", "state": "Karnataka"},
+        {"qualification_level": "MSc", "course": "M.Sc.", "specialization": "Physics", "institute": "Christ University",
+         "board_or_university": "Christ University", "year_of_completion": "2017", "current_status": None,
+         "grade_or_percentage": "8.9 CGPA", "country": "India", "state": "Karnataka"}
+    ],
+    "work_experience": [
+        {"designation": "Assistant Professor", "company": "Christ University", "employment_type": "fulltime",
+         "from_date": "2021-06-01", "to_date": "Present", "current_salary": None, "notice_period": "90",
+         "years": "3", "months": "4", "description": "Teaching and research in physics"},
+        {"designation": "Research Associate", "company": "IISc", "employment_type": "fulltime",
+         "from_date": "2019-01-01", "to_date": "2021-05-31", "current_salary": None, "notice_period": None,
+         "years": "2", "months": "5", "description": "Spectroscopy research"}
+    ],
+    "research_experience": {
+        "has_research": True,
+        "research_areas": ["Spectroscopy"],
+        "publications": ["Raman spectroscopy of layered materials"],
+        "conferences": ["International Conference on Spectroscopy 2019"],
+        "awards": None,
+        "collaborations": None
+    },
+    "additional_informations": {
+        "profile_summary": "Physicist with six years of research and teaching experience",
+        "skills": ["Python", "Spectroscopy"],
+        "awards": None,
+        "publications": ["Raman spectroscopy of layered materials"],
+        "conferences": ["International Conference on Spectroscopy 2019"],
+        "collaborators": None,
+        "languages": ["English", "Kannada"],
+        "certifications": None,
+        "volunteer_work": None
+    }
+}
+
+
+class LLMBackend:
+    """Chat-completion backend used by ResumeParser"""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float,
+                       max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Return the assistant reply to messages and its prompt/completion token usage"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections"""
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI, or any OpenAI-compatible server when base_url is given"""
+
+    name = "openai"
+
+    def __init__(self, model: str, api_key: str, base_url: Optional[str] = None):
+        super().__init__(model)
+        # One pooled HTTP client shared by every LLM call so connections are
+        # kept alive and many requests can be in flight on a single worker
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+            ),
+            timeout=httpx.Timeout(
+                float(os.getenv("LLM_TIMEOUT", "60")),
+                connect=float(os.getenv("LLM_CONNECT_TIMEOUT", "10")),
+            ),
+        )
+        # Retries are left to the LLM scheduler, which also paces the other callers
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client, max_retries=0)
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float,
+                       max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        usage = {}
+        if response.usage is not None:
+            usage = {"prompt_tokens": response.usage.prompt_tokens, "completion_tokens": response.usage.completion_tokens}
+        return response.choices[0].message.content, usage
+
+    async def close(self):
+        await self.client.close()
+
+
+class MockBackend(LLMBackend):
+    """
+    Offline backend for load tests and profiling: replies with a fixed
+    resume after a simulated latency. Jitter is seeded by the prompt, so the
+    same prompt always gets the same delay. With an rpm_limit it also acts as
+    a rate-limited provider, answering 429 to calls beyond rpm_limit / 60 in
+    any one second.
+    """
+
+    name = "mock"
+
+    def __init__(self, model: str = "mock", latency: float = 0.8, jitter: float = 0.2,
+                 response: Optional[Dict[str, Any]] = None, rpm_limit: float = 0):
+        super().__init__(model)
+        self.latency = latency
+        self.jitter = jitter
+        self.response = response if response is not None else MOCK_RESPONSE
+        self.rpm_limit = rpm_limit
+        self._accepted = deque()
+
+    def _check_rate_limit(self):
+        now = time.monotonic()
+        while self._accepted and now - self._accepted[0] >= 1:
+            self._accepted.popleft()
+        if len(self._accepted) >= max(self.rpm_limit / 60, 1):
+            retry_after = 1 - (now - self._accepted[0])
+            response = httpx.Response(429, headers={"retry-after": f"{retry_after:.3f}"},
+                                      request=httpx.Request("POST", "http://mock/v1/chat/completions"))
+            raise openai.RateLimitError("Rate limit reached for requests", response=response, body=None)
+        self._accepted.append(now)
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float,
+                       max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        if self.rpm_limit:
+            self._check_rate_limit()
+        prompt = messages[-1]["content"]
+        seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+        delay = self.latency + random.Random(seed).uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(delay, 0.0))
+
+        reply = {key: value for key, value in self.response.items() if f'"{key}"' in prompt}
+        content = json.dumps(reply or self.response, indent=2)
+        # Honour the reply budget the way a real model would: cut the output short
+        if estimate_tokens(content) > max_tokens:
+            content = content[:max_tokens * 4]
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(message["content"]) for message in messages),
+            "completion_tokens": estimate_tokens(content),
+        }
+        return content, usage
+
+
+def create_backend() -> LLMBackend:
+    """
+    Build the backend chosen by LLM_BACKEND:
+    openai (default), local (OpenAI-compatible server at LLM_BASE_URL) or mock
+    """
+    backend = os.getenv("LLM_BACKEND", "openai").lower()
+    model = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+
+    if backend == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key or api_key == "your_openai_api_key_here":
+            raise ValueError(
+                "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file. "
+                "Copy env_template.txt to .env and add your actual API key."
+            )
+        return OpenAIBackend(model, api_key, os.getenv("LLM_BASE_URL") or None)
+
+    if backend == "local":
+        base_url = os.getenv("LLM_BASE_URL")
+        if not base_url:
+            raise ValueError("LLM_BASE_URL must be set when LLM_BACKEND=local")
+        # Local servers usually ignore the key, but the client needs one
+        local = OpenAIBackend(model, os.getenv("OPENAI_API_KEY") or "local", base_url)
+        local.name = "local"
+        return local
+
+    if backend == "mock":
+        response = None
+        fixture = os.getenv("LLM_MOCK_RESPONSE_FILE")
+        if fixture:
+            with open(fixture, "r", encoding="utf-8") as f:
+                response = json.load(f)
+        return MockBackend(
+            model=f"mock:{model}",
+            latency=float(os.getenv("LLM_MOCK_LATENCY_MS", "800")) / 1000,
+            jitter=float(os.getenv("LLM_MOCK_JITTER_MS", "200")) / 1000,
+            response=response,
+            rpm_limit=float(os.getenv("LLM_MOCK_RPM_LIMIT", "0")),
+        )
+
+    raise ValueError("LLM_BACKEND must be one of: openai, local, mock")
@@ -0,0 +1,195 @@
+"""
+Rate-limit-aware admission of LLM calls.
+
+Every chat completion goes through LLMScheduler, which
+- paces calls with two token buckets, one for requests and one for estimated
+  tokens, refilled at the provider's per-minute limits
+- admits waiting calls by lane: interactive uploads ahead of batch and
+  background jobs, first come first served within a lane
+- retries rate-limit (429), server (5xx) and connection errors with
+  exponential backoff and full jitter, honouring Retry-After; a 429 also
+  pauses admission for every caller, not just the one that hit it
+
+Buckets are per process. With several workers, give each its share of the
+provider limit.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import openai
+
+from metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_RETRIES
+from text_preprocessing import estimate_tokens
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Lower rank is admitted first
+LANE_RANK = {INTERACTIVE: 0, BATCH: 1}
+
+# Failures where the same call may well succeed a little later
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+
+class TokenBucket:
+    """
+    Allowance refilled continuously at per_minute / 60 units a second, holding
+    at most burst_seconds of refill (and at least one unit). A call larger
+    than the bucket is admitted once it is full and leaves it in debt, so
+    large calls are paced too.
+    per_minute=0 means unlimited.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return max(min(amount, self.capacity) - self.level, 0.0) / self.rate
+
+    def take(self, amount: float, now: float):
+        if self.rate:
+            self._refill(now)
+            self.level -= amount
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from a Retry-After header"""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_reason(error: BaseException) -> str:
+    status = getattr(error, "status_code", None)
+    return str(status) if status is not None else "connection"
+
+
+class LLMScheduler:
+    """Admits, paces and retries calls to one LLM backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        # 0 spaces calls evenly; providers also enforce their limits over
+        # windows much shorter than a minute, so a burst is soon rejected
+        burst_seconds = float(os.getenv("LLM_RATE_BURST_SECONDS", "0"))
+        self.requests = TokenBucket(float(os.getenv("LLM_RPM_LIMIT", "0")), burst_seconds)
+        self.tokens = TokenBucket(float(os.getenv("LLM_TPM_LIMIT", "0")), burst_seconds)
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+        self.retry_max_delay = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+        # Waiting calls as (lane rank, arrival number, token cost, future)
+        self._waiting: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._waiting if not future.done())
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                       stats: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """
+        Call the backend once admitted, retrying transient failures. stats
+        names the lane and collects the calls, retries and queueing time.
+        """
+        lane = stats.get("lane", INTERACTIVE)
+        # Providers count the prompt plus the whole reply budget against the limit
+        cost = sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+        # Retries keep their place in the lane
+        arrival = next(self._arrivals)
+
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            stats["queue_depth"] = max(stats.get("queue_depth", 0), self.queue_depth)
+            await self._admit(lane, arrival, cost)
+            waited = time.perf_counter() - started
+            LLM_QUEUE_WAIT.labels(lane).observe(waited)
+            stats["queue_seconds"] = round(stats.get("queue_seconds", 0.0) + waited, 3)
+            stats["calls"] = stats.get("calls", 0) + 1
+            try:
+                return await self.backend.complete(messages, temperature, max_tokens)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                LLM_RETRIES.labels(_retry_reason(e)).inc()
+                stats["retries"] = stats.get("retries", 0) + 1
+                await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential delay, at least any Retry-After"""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        hint = retry_after(error)
+        if hint is not None:
+            delay = max(delay, hint)
+        if isinstance(error, openai.RateLimitError):
+            # Over the provider's limit: hold back everyone, not just this call
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    async def _admit(self, lane: str, arrival: int, cost: float):
+        """Wait until the buckets allow this call and no earlier or higher-priority call is waiting"""
+        now = time.monotonic()
+        if not self.queue_depth and self._ready_in(cost, now) <= 0:
+            self._take(cost, now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (LANE_RANK.get(lane, LANE_RANK[BATCH]), arrival, cost, future))
+        depth = LLM_QUEUE_DEPTH.labels(lane)
+        depth.inc()
+        self._dispatch()
+        try:
+            await future
+        finally:
+            depth.dec()
+            if future.cancelled() or not future.done():
+                # Caller was cancelled while waiting: drop it and let the next one through
+                future.cancel()
+                self._dispatch()
+
+    def _ready_in(self, cost: float, now: float) -> float:
+        return max(self._paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(cost, now))
+
+    def _take(self, cost: float, now: float):
+        self.requests.take(1, now)
+        self.tokens.take(cost, now)
+
+    def _dispatch(self):
+        """Admit waiting calls in order for as long as the buckets allow, then sleep until the next fits"""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        now = time.monotonic()
+        while self._waiting:
+            _, _, cost, future = self._waiting[0]
+            if future.done():
+                heapq.heappop(self._waiting)
+                continue
+            delay = self._ready_in(cost, now)
+            if delay > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiting)
+            self._take(cost, now)
+            future.set_result(None)
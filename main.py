@@ -1,11 +1,28 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+import asyncio
+import functools
+import hashlib
+import hmac
+import io
 import os
+import time
+import zipfile
 from dotenv import load_dotenv
 import json
-from resume_parser import ResumeParser
-from dto_mapper import DTOMapper
+from typing import Dict, Any, List, Optional, Tuple, Union
+from resume_parser import ResumeParser, PROMPT_VERSION
+from extraction_pool import ExtractionPoolFull, ExtractionTimeout
+from dto_mapper import DTOMapper, MAPPER_VERSION
+from result_cache import ResultCache
+from single_flight import SingleFlight
+from job_queue import JobQueue
+from llm_scheduler import BATCH, INTERACTIVE
+import serialization
+import metrics
+from profiling import ProfileStore
+from uploads import SIGNATURE_BYTES, StoredUpload, UploadLimitMiddleware, has_valid_signature, store_upload
 
 # Load environment variables
 load_dotenv()
@@ -21,16 +38,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count requests in flight for /metrics
+app.add_middleware(metrics.InFlightMiddleware)
+
+# Compress responses for clients that send Accept-Encoding: gzip, flushing
+# each chunk of a streamed response as it is sent
+app.add_middleware(serialization.StreamingGZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")))
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx')
+
+# Batch parsing limits
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_ZIP_BYTES = int(os.getenv("BATCH_MAX_ZIP_BYTES", str(500 * 1024 * 1024)))
+
+# Single-file uploads are streamed to UPLOAD_TMP_DIR and capped at UPLOAD_MAX_BYTES
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+# Room for multipart boundaries and headers around the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Reject oversized request bodies with 413 before they are read
+app.add_middleware(UploadLimitMiddleware, limits={
+    "/parse-resume": UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES if UPLOAD_MAX_BYTES else 0,
+    "/jobs": UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES if UPLOAD_MAX_BYTES else 0,
+    "/parse-resumes": BATCH_MAX_ZIP_BYTES,
+})
+
+# Shared secret for /admin endpoints (unset disables them)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # Initialize components
 try:
     resume_parser = ResumeParser()
     dto_mapper = DTOMapper()
+    result_cache = ResultCache()
+    profile_store = ProfileStore()
 except ValueError as e:
     print(f"Initialization Error: {e}")
     print("Please create a .env file with your OpenAI API key.")
-    print("Copy env_template.txt to .env and add your actual API key.")
+    print("Copy env_template.txt to .env and add your actual API key,")
+    print("or set LLM_BACKEND=mock to run without a network connection.")
     exit(1)
 
+@app.on_event("startup")
+async def startup():
+    """Start the background job workers and the master-data watcher"""
+    job_queue.start()
+    dto_mapper.start_watcher()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections on shutdown"""
+    await job_queue.stop()
+    await dto_mapper.stop_watcher()
+    await resume_parser.close()
+    result_cache.close()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -39,37 +103,327 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /parse-resume": "Parse uploaded resume file",
+            "POST /parse-resumes": "Parse many resume files or a zip archive concurrently",
+            "POST /jobs": "Queue a resume for background parsing",
+            "GET /jobs/{job_id}": "Get the status and result of a parse job",
+            "GET /profiles/{profile_id}": "Download a request profile (allowlisted clients)",
+            "POST /admin/master-data/reload": "Reload master data without a restart (admin token)",
             "GET /health": "Health check endpoint"
         }
     }
 
-@app.post("/parse-resume")
-async def parse_resume(file: UploadFile = File(...)):
+def json_response(payload: Dict[str, Any], status_code: int = 200, accept: Optional[str] = None) -> Response:
+    """
+    Serialize straight to bytes, skipping FastAPI's generic encoder.
+    Uses MessagePack instead of JSON when the Accept header asks for it.
+    """
+    content, media_type = serialization.encode(payload, accept)
+    return Response(content=content, status_code=status_code, media_type=media_type)
+
+def check_fields(fields: Optional[str]):
+    """Reject a fields projection that names unknown DTO sections"""
+    if not fields:
+        return
+    known = dto_mapper.templates["base"].keys
+    unknown = [field.strip() for field in fields.split(",") if field.strip() and field.strip() not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown DTO fields: {', '.join(unknown)}")
+
+# Parses running right now by cache key; identical uploads arriving meanwhile
+# (a double-submitted form, several recruiters opening one applicant) share them
+in_flight = SingleFlight()
+
+async def process_resume(document: Union[bytes, StoredUpload], filename: str, use_cache: bool = True,
+                         inline_extraction: bool = False,
+                         priority: str = INTERACTIVE) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Parse uploaded resume and return structured DTO
+    Run the parse and mapping pipeline for one file (its content, or an upload
+    stored on disk), serving repeats from the result cache, and joining an
+    identical parse already in flight, unless use_cache is false. priority is
+    the LLM scheduler lane (batch work yields to interactive uploads).
+    Returns the DTO and response metadata.
     """
+    if isinstance(document, StoredUpload):
+        content_digest, source = document.sha256, document.path
+    else:
+        content_digest, source = hashlib.sha256(document).hexdigest(), document
+    master_version = dto_mapper.master.version
+    cache_key = result_cache.make_key(
+        content_digest, filename, PROMPT_VERSION, resume_parser.structuring, resume_parser.fast_extraction,
+        resume_parser.model, MAPPER_VERSION, dto_mapper.master.source_sha256
+    )
+    
+    dto = result_cache.get(cache_key) if use_cache else None
+    if dto is not None:
+        metrics.CACHE_REQUESTS.labels("hit").inc()
+        return dto, {"cache": "hit", "master_data": master_version}
+    
+    if not use_cache:
+        metrics.CACHE_REQUESTS.labels("miss").inc()
+        return await _parse_and_map(source, filename, cache_key, master_version, False, inline_extraction, priority)
+    
+    def start_parse():
+        task = asyncio.ensure_future(
+            _parse_and_map(source, filename, cache_key, master_version, True, inline_extraction, priority)
+        )
+        if isinstance(document, StoredUpload):
+            # The shared parse can outlive the request that uploaded the file
+            document.retain()
+            task.add_done_callback(lambda _: document.close())
+        return task
+    
+    coalesced = in_flight.running(cache_key)
+    metrics.CACHE_REQUESTS.labels("coalesced" if coalesced else "miss").inc()
+    dto, meta = await in_flight.run(cache_key, start_parse)
+    # Every caller gets its own meta, since handlers add to it
+    return dto, dict(meta, cache="coalesced") if coalesced else dict(meta)
+
+async def _parse_and_map(source: Union[bytes, str], filename: str, cache_key: str, master_version: Dict[str, Any],
+                         reuse_similar: bool, inline_extraction: bool,
+                         priority: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Parse and map one file and store the DTO in the result cache"""
+    meta = {"cache": "miss"}
     try:
-        # Validate file type
-        if not file.filename.lower().endswith(('.pdf', '.doc', '.docx')):
-            raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are supported")
-        
-        # Read file content
-        file_content = await file.read()
-        
         # Parse resume
-        extracted_data = await resume_parser.parse_resume(file_content, file.filename)
+        extracted_data = await resume_parser.parse_resume(
+            source, filename, stats=meta, inline_extraction=inline_extraction, reuse_similar=reuse_similar,
+            priority=priority
+        )
         
         # Map to DTO
-        dto = dto_mapper.map_to_dto(extracted_data)
+        started = time.perf_counter()
+        dto = dto_mapper.map_to_dto(extracted_data, stats=meta)
+        metrics.STAGE_SECONDS.labels("mapping").time_since(started)
+    except Exception as e:
+        metrics.ERRORS.labels(metrics.root_error_name(e)).inc()
+        raise
+    
+    # Master data reloaded while this resume was parsing: the DTO no longer
+    # belongs under the key computed above
+    if meta["master_data"] == master_version:
+        result_cache.set(cache_key, dto)
+    return dto, meta
+
+job_queue = JobQueue(functools.partial(process_resume, priority=BATCH))
+
+def prepare_fork():
+    """Load state the workers share before a preloading server forks them"""
+    dto_mapper.master.preload()
+
+def after_fork():
+    """Give a forked worker its own SQLite connections"""
+    result_cache.reopen()
+    job_queue.reopen()
+    resume_parser.near_duplicates.reopen()
+
+@app.post("/parse-resume")
+async def parse_resume(request: Request, file: UploadFile = File(...), fields: Optional[str] = None,
+                       exclude_nulls: bool = False, profile: bool = False):
+    """
+    Parse uploaded resume and return structured DTO.
+    fields limits the DTO to the listed top-level sections (comma-separated)
+    and exclude_nulls drops null-valued keys. profile=true (or X-Profile: 1)
+    profiles the request for allowlisted clients.
+    """
+    # Validate file type and options
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are supported")
+    check_fields(fields)
+    
+    # Stream the upload to a temporary file, checking its signature and size
+    upload = await asyncio.to_thread(store_upload, file.file, file.filename, UPLOAD_MAX_BYTES, UPLOAD_TMP_DIR)
+    
+    requested = profile or request.headers.get("x-profile") == "1"
+    profiler = profile_store.start(requested, request.client.host if request.client else None)
+    # An explicit profile measures the full pipeline, so skip the cache and
+    # keep extraction in this process where the profiler can sample it
+    explicit = profiler is not None and not profiler.automatic
+    
+    try:
+        # Parse and map, or serve from the result cache
+        try:
+            dto, meta = await process_resume(
+                upload, file.filename, use_cache=not explicit, inline_extraction=explicit
+            )
+        finally:
+            if profiler is not None:
+                profile_summary = profile_store.finish(profiler)
+        if profiler is not None:
+            meta["profile"] = profile_summary
         
-        return {
+        return json_response({
             "success": True,
-            "data": dto,
-            "message": "Resume parsed successfully"
-        }
+            "data": serialization.shape_dto(dto, fields, exclude_nulls),
+            "message": "Resume parsed successfully",
+            "meta": meta
+        }, accept=request.headers.get("accept"))
         
+    except ExtractionPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExtractionTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
+    finally:
+        upload.close()
+
+def _expand_batch_upload(filename: str, file_content: bytes) -> List[Tuple[str, bytes]]:
+    """Return the resume files in an upload, unpacking zip archives"""
+    if not filename.lower().endswith(".zip"):
+        return [(filename, file_content)]
+    
+    files = []
+    total_size = 0
+    with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or os.path.basename(info.filename).startswith(("._", ".")):
+                continue
+            total_size += info.file_size
+            if total_size > BATCH_MAX_ZIP_BYTES:
+                raise ValueError(f"Zip archive {filename} expands beyond {BATCH_MAX_ZIP_BYTES} bytes")
+            files.append((info.filename, archive.read(info)))
+    return files
+
+async def _parse_batch_item(index: int, filename: str, file_content: bytes, semaphore: asyncio.Semaphore,
+                            fields: Optional[str] = None, exclude_nulls: bool = False) -> Dict[str, Any]:
+    """Parse one file of a batch, reporting failure instead of raising"""
+    result = {"index": index, "filename": filename}
+    
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        result.update(success=False, error="Only PDF, DOC, and DOCX files are supported")
+        return result
+    if not has_valid_signature(filename, file_content[:SIGNATURE_BYTES]):
+        result.update(success=False, error=f"{filename} does not match its file type")
+        return result
+    
+    async with semaphore:
+        try:
+            dto, meta = await process_resume(file_content, filename, priority=BATCH)
+            result.update(success=True, data=serialization.shape_dto(dto, fields, exclude_nulls), meta=meta)
+        except Exception as e:
+            result.update(success=False, error=str(e))
+    return result
+
+@app.post("/parse-resumes")
+async def parse_resumes(request: Request, files: List[UploadFile] = File(...), stream: bool = False,
+                        fields: Optional[str] = None, exclude_nulls: bool = False):
+    """
+    Parse many resumes (or zip archives of resumes) concurrently.
+    Returns per-file results in one response, or NDJSON lines as each file
+    completes when stream=true. A failing file never fails the batch.
+    fields and exclude_nulls work as for /parse-resume.
+    """
+    check_fields(fields)
+    
+    batch = []
+    for upload in files:
+        content = await upload.read()
+        try:
+            batch.extend(_expand_batch_upload(upload.filename, content))
+        except (zipfile.BadZipFile, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid archive {upload.filename}: {str(e)}")
+    
+    if len(batch) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_FILES} files")
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.ensure_future(_parse_batch_item(index, filename, content, semaphore, fields, exclude_nulls))
+        for index, (filename, content) in enumerate(batch)
+    ]
+    
+    if stream:
+        async def ndjson_lines():
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    yield serialization.dumps(await completed) + b"\n"
+            finally:
+                # Client went away: stop parsing the rest of the batch
+                for task in tasks:
+                    task.cancel()
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    results = await asyncio.gather(*tasks)
+    succeeded = sum(1 for result in results if result["success"])
+    return json_response({
+        "success": True,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        "message": f"Parsed {succeeded} of {len(results)} resumes"
+    }, accept=request.headers.get("accept"))
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...)):
+    """
+    Queue a resume for background parsing and return its job id immediately
+    """
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are supported")
+    
+    file_content = await file.read()
+    if not has_valid_signature(file.filename, file_content[:SIGNATURE_BYTES]):
+        raise HTTPException(status_code=415, detail=f"{file.filename} does not match its file type")
+    job_id = job_queue.enqueue(file_content, file.filename)
+    
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "message": "Resume queued for parsing"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str, fields: Optional[str] = None, exclude_nulls: bool = False):
+    """
+    Return job status, plus the DTO once the job has completed.
+    fields and exclude_nulls work as for /parse-resume.
+    """
+    check_fields(fields)
+    
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if "data" in job:
+        job["data"] = serialization.shape_dto(job["data"], fields, exclude_nulls)
+    return json_response(job, accept=request.headers.get("accept"))
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(request: Request, profile_id: str):
+    """
+    Stored request profile in collapsed-stack format (for flamegraph.pl or
+    speedscope). Only available to allowlisted clients.
+    """
+    if not profile_store.allowed(request.client.host if request.client else None):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled for this client")
+    
+    profile = profile_store.read(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or rotated out")
+    return Response(content=profile, media_type="text/plain")
+
+@app.post("/admin/master-data/reload")
+async def reload_master_data(request: Request):
+    """
+    Reload the master-data JSON if it changed, swapping it in without
+    stalling requests. Requires the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token missing or invalid")
+    
+    try:
+        result = await asyncio.to_thread(dto_mapper.reload_master_data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading master data: {str(e)}")
+    return {"success": True, **result}
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,131 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def _trigrams(text: str) -> List[str]:
+    """Character trigrams of text with spaces and punctuation removed"""
+    key = _NON_ALNUM.sub("", text.lower())
+    if not key:
+        return []
+    padded = f"  {key} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class CategoryIndex:
+    """
+    Lookup index over the values of one master-data category.
+
+    Resolves a value to the ID of the first row (in file order) whose
+    lowercased name contains it, exactly like a linear substring scan:
+    - names map straight to their answer through a hash table
+    - any other substring is found by binary search over a sorted array
+      of every name suffix, then taking the earliest row in the match range
+
+    Values that are not a substring of any name ("Bengaluru", "Tamil Nadu")
+    can be resolved fuzzily through a character-trigram inverted index.
+    """
+
+    MEMO_SIZE = 4096
+
+    def __init__(self, values: List[Dict[str, Any]]):
+        self.ids = [str(item.get("id", 1)) for item in values]
+        self.names = [str(item.get("name", "")).strip() for item in values]
+        names = [name.lower() for name in self.names]
+
+        suffixes = sorted(
+            (name[start:], position)
+            for position, name in enumerate(names)
+            for start in range(len(name))
+        )
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._owners = [position for _, position in suffixes]
+
+        self._exact: Dict[str, Optional[int]] = {}
+        for name in names:
+            if name and name not in self._exact:
+                self._exact[name] = self._search(name)
+
+        self._memo: Dict[str, Optional[int]] = {}
+
+        # Trigram -> rows containing it, for fuzzy matching
+        self._trigram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for position, item in enumerate(values):
+            grams = _trigrams(item["name"]) if isinstance(item.get("name"), str) else []
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def to_state(self) -> tuple:
+        """Index contents as plain builtins, for the master-data snapshot"""
+        return (self.ids, self.names, self._suffixes, self._owners, self._exact,
+                self._trigram_counts, self._postings)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "CategoryIndex":
+        """Rebuild an index from to_state() without recomputing it"""
+        index = cls.__new__(cls)
+        (index.ids, index.names, index._suffixes, index._owners, index._exact,
+         index._trigram_counts, index._postings) = state
+        index._memo = {}
+        return index
+
+    def find(self, value: str) -> Optional[str]:
+        """Return the ID for an already stripped and lowercased value"""
+        if value in self._exact:
+            position = self._exact[value]
+        elif value in self._memo:
+            position = self._memo[value]
+        else:
+            position = self._search(value)
+            if len(self._memo) >= self.MEMO_SIZE:
+                self._memo.clear()
+            self._memo[value] = position
+
+        return self.ids[position] if position is not None else None
+
+    def fuzzy_find(self, value: str, top_k: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Return up to top_k (id, name, score) candidates ranked by trigram Dice
+        similarity, best first; ties go to the earlier row
+        """
+        grams = _trigrams(value)
+        if not grams:
+            return []
+
+        overlaps = Counter()
+        for gram in grams:
+            overlaps.update(self._postings.get(gram, ()))
+
+        scored = (
+            (2.0 * shared / (len(grams) + self._trigram_counts[position]), -position)
+            for position, shared in overlaps.items()
+        )
+        return [
+            (self.ids[-negative_position], self.names[-negative_position], round(score, 3))
+            for score, negative_position in heapq.nlargest(top_k, scored)
+        ]
+
+    def _search(self, needle: str) -> Optional[int]:
+        """Earliest row whose name contains needle"""
+        best = None
+        index = bisect_left(self._suffixes, needle)
+        while index < len(self._suffixes) and self._suffixes[index].startswith(needle):
+            owner = self._owners[index]
+            if best is None or owner < best:
+                best = owner
+            index += 1
+        return best
+
+
+def build_indexes(master_data: Dict[str, Any]) -> Dict[str, CategoryIndex]:
+    """Build a CategoryIndex for every category in the master data"""
+    return {
+        category: CategoryIndex(data.get("values", []))
+        for category, data in master_data.items()
+    }
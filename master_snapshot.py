@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Precompiled master-data snapshot.
+
+The master-data JSON and every category's lookup index are compiled into one
+binary file. Each category is a separate marshal blob, so a process maps the
+file and unpacks only the categories it actually looks up. The header records
+the SHA-256 of the source JSON; a stale or unreadable snapshot is rebuilt
+automatically.
+
+Build it ahead of deployment (run from the repository root):
+    python master_snapshot.py [--force]
+"""
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from master_index import CategoryIndex
+
+# Bump whenever the snapshot layout or CategoryIndex state changes
+SNAPSHOT_FORMAT = 2
+MAGIC = b"RAMDSNAP"
+# marshal output is only readable by the Python version that wrote it
+_PYTHON_TAG = sys.implementation.cache_tag
+
+# Raised by a missing, truncated or foreign snapshot file
+_SNAPSHOT_ERRORS = (OSError, ValueError, EOFError, TypeError, struct.error)
+
+DEFAULT_SOURCE_PATH = "complete_master_data_mappings_csv_only.json"
+DEFAULT_SNAPSHOT_PATH = os.path.join("cache", "master_data.snapshot")
+
+
+def source_hash(path: str) -> str:
+    """SHA-256 of the master-data JSON"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _load_source(path: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Categories of the master-data JSON and its ERP export date"""
+    with open(path, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    return source["master_data_mappings"], (source.get("metadata") or {}).get("generated_on")
+
+
+def _compile(category_data: Dict[str, Any]) -> Tuple[Dict[str, Any], CategoryIndex]:
+    return category_data, CategoryIndex(category_data.get("values", []))
+
+
+def build_snapshot(source_path: str, snapshot_path: str) -> str:
+    """Compile the master data into a snapshot; returns the source hash"""
+    digest = source_hash(source_path)
+    master_data, generated_on = _load_source(source_path)
+
+    blobs, table, offset = [], {}, 0
+    for category, category_data in master_data.items():
+        data, index = _compile(category_data)
+        blob = marshal.dumps((data, index.to_state()))
+        table[category] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = marshal.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "python": _PYTHON_TAG,
+        "source_sha256": digest,
+        "generated_on": generated_on,
+        "categories": table,
+    })
+
+    # Write beside the target and rename, so readers never see a partial file
+    # and workers racing to rebuild simply replace each other's identical output
+    directory = os.path.dirname(snapshot_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".master_data.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack(">I", len(header)) + header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return digest
+
+
+class _CategoryView(Mapping):
+    """Read-only category -> value view that loads categories on first access"""
+
+    def __init__(self, master: "MasterData", part: int):
+        self._master = master
+        self._part = part
+
+    def __getitem__(self, category: str):
+        return self._master.load(category)[self._part]
+
+    def __contains__(self, category: object) -> bool:
+        return category in self._master.categories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._master.categories)
+
+    def __len__(self) -> int:
+        return len(self._master.categories)
+
+
+class MasterData:
+    """
+    Master-data categories and their lookup indexes.
+    data maps a category to its JSON object and indexes to its CategoryIndex;
+    both load the category from the snapshot on first access.
+    """
+
+    def __init__(self, source_sha256: str, generated_on: Optional[str], categories: Tuple[str, ...],
+                 loaded: Optional[Dict[str, Tuple[Dict[str, Any], CategoryIndex]]] = None,
+                 snapshot: Optional[mmap.mmap] = None, table: Optional[Dict[str, Tuple[int, int]]] = None,
+                 base: int = 0):
+        self.source_sha256 = source_sha256
+        self.generated_on = generated_on
+        self.categories = categories
+        self._loaded = loaded if loaded is not None else {}
+        self._snapshot = snapshot
+        self._table = table or {}
+        self._base = base
+        self._lock = threading.Lock()
+        self.data = _CategoryView(self, 0)
+        self.indexes = _CategoryView(self, 1)
+
+    @classmethod
+    def from_source(cls, source_path: str) -> "MasterData":
+        """Parse the JSON and build every index now (no snapshot)"""
+        digest = source_hash(source_path)
+        master_data, generated_on = _load_source(source_path)
+        loaded = {category: _compile(category_data) for category, category_data in master_data.items()}
+        return cls(digest, generated_on, tuple(master_data), loaded=loaded)
+
+    @classmethod
+    def open_snapshot(cls, snapshot_path: str) -> "MasterData":
+        """Map a snapshot file; raises ValueError if it is not a readable snapshot"""
+        with open(snapshot_path, "rb") as f:
+            snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            prefix = len(MAGIC) + 4
+            if snapshot[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a master-data snapshot")
+            (header_length,) = struct.unpack(">I", snapshot[len(MAGIC):prefix])
+            header = marshal.loads(snapshot[prefix:prefix + header_length])
+            if header.get("format") != SNAPSHOT_FORMAT or header.get("python") != _PYTHON_TAG:
+                raise ValueError("snapshot was written by another format or Python version")
+        except _SNAPSHOT_ERRORS:
+            snapshot.close()
+            raise
+        return cls(header["source_sha256"], header["generated_on"], tuple(header["categories"]), snapshot=snapshot,
+                   table=header["categories"], base=prefix + header_length)
+
+    @property
+    def version(self) -> Dict[str, Optional[str]]:
+        """Identifies the data: ERP export date and short source hash"""
+        return {"generated_on": self.generated_on, "sha256": self.source_sha256[:12]}
+
+    @property
+    def loaded_categories(self) -> Tuple[str, ...]:
+        return tuple(self._loaded)
+
+    def preload(self, categories=None):
+        """Unpack the given categories (all by default) ahead of their first lookup"""
+        for category in self.categories if categories is None else categories:
+            if category in self.categories:
+                self.load(category)
+
+    def load(self, category: str) -> Tuple[Dict[str, Any], CategoryIndex]:
+        """JSON object and index of one category, unpacked on first use"""
+        entry = self._loaded.get(category)
+        if entry is not None:
+            return entry
+        if category not in self._table:
+            raise KeyError(category)
+        with self._lock:
+            entry = self._loaded.get(category)
+            if entry is None:
+                offset, length = self._table[category]
+                start = self._base + offset
+                data, state = marshal.loads(self._snapshot[start:start + length])
+                entry = self._loaded[category] = (data, CategoryIndex.from_state(state))
+        return entry
+
+    def close(self):
+        """Unmap the snapshot; categories already loaded stay usable"""
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+
+def load_master_data(source_path: str = DEFAULT_SOURCE_PATH,
+                     snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH) -> MasterData:
+    """
+    Open the snapshot for source_path, rebuilding it first if it is missing,
+    unreadable or built from a different source. Without a snapshot path, or
+    if the snapshot cannot be written, the JSON is parsed directly.
+    """
+    if not snapshot_path:
+        return MasterData.from_source(source_path)
+
+    digest = source_hash(source_path)
+    try:
+        master = MasterData.open_snapshot(snapshot_path)
+        if master.source_sha256 == digest:
+            return master
+        master.close()
+    except _SNAPSHOT_ERRORS:
+        pass
+
+    try:
+        build_snapshot(source_path, snapshot_path)
+        return MasterData.open_snapshot(snapshot_path)
+    except OSError:
+        # Read-only deployment without a prebuilt snapshot: still serve requests
+        return MasterData.from_source(source_path)
+
+
+def main():
+    force = "--force" in sys.argv[1:]
+    source_path = os.getenv("MASTER_DATA_PATH", DEFAULT_SOURCE_PATH)
+    snapshot_path = os.getenv("MASTER_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+    if not snapshot_path:
+        print("MASTER_SNAPSHOT_PATH is empty; snapshots are disabled")
+        sys.exit(1)
+
+    if not force:
+        try:
+            master = MasterData.open_snapshot(snapshot_path)
+            master.close()
+            if master.source_sha256 == source_hash(source_path):
+                print(f"{snapshot_path} is up to date")
+                return
+        except _SNAPSHOT_ERRORS:
+            pass
+
+    started = time.perf_counter()
+    digest = build_snapshot(source_path, snapshot_path)
+    print(f"Built {snapshot_path} from {source_path} ({digest[:12]}): "
+          f"{os.path.getsize(snapshot_path) / 1024:.0f} KB in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
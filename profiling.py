@@ -0,0 +1,171 @@
+import ipaddress
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# A thread whose innermost frame is in one of these files is blocked waiting
+# (idle pool workers, the event loop with nothing to run) and is not sampled
+_IDLE_FILES = ("threading.py", "thread.py", "queue.py", "selectors.py", "connection.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler: a background thread records the stack of
+    every busy thread in the process at a fixed interval. The result is in
+    collapsed-stack format ("frame;frame;frame count" per line), which
+    flamegraph.pl, speedscope and inferno read directly.
+
+    Every busy thread is sampled, so requests running concurrently on the
+    same event loop show up in the profile too. Time spent awaiting the LLM
+    leaves the loop idle and shows up only in the wall-clock seconds.
+    """
+
+    def __init__(self, interval: float = 0.005, automatic: bool = False):
+        self.interval = interval
+        self.automatic = automatic
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = 0.0
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if ident not in names:
+                    thread = threading._active.get(ident)
+                    names[ident] = thread.name if thread is not None else str(ident)
+                stack.append(names[ident])
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Innermost frames that were seen most often"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"frame": frame, "samples": count, "share": round(count / total, 3)}
+            for frame, count in leaves.most_common(limit)
+        ]
+
+
+class ProfileStore:
+    """
+    Request profiling policy and storage.
+
+    A request is profiled when the client is on the allowlist and asks for it
+    (X-Profile: 1 header or ?profile=true), or automatically for one in every
+    PROFILE_SAMPLE_EVERY requests. Profiles are written to PROFILE_DIR, which
+    is kept to the newest PROFILE_MAX_FILES files like a ring buffer.
+    """
+
+    def __init__(self):
+        self.allowlist = [
+            ipaddress.ip_network(entry.strip(), strict=False)
+            for entry in os.getenv("PROFILE_ALLOWLIST", "").split(",")
+            if entry.strip()
+        ]
+        self.sample_every = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+        self.interval = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+        self.directory = os.getenv("PROFILE_DIR", os.path.join("cache", "profiles"))
+        self.max_files = int(os.getenv("PROFILE_MAX_FILES", "50"))
+        self._requests = 0
+        self._sampling = False
+
+    def allowed(self, client_host: Optional[str]) -> bool:
+        """Whether this client may request a profile"""
+        if not client_host or not self.allowlist:
+            return False
+        try:
+            address = ipaddress.ip_address(client_host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowlist)
+
+    def start(self, requested: bool, client_host: Optional[str]) -> Optional[SamplingProfiler]:
+        """Start a profiler if this request should be profiled"""
+        if requested and self.allowed(client_host):
+            return SamplingProfiler(self.interval).start()
+
+        self._requests += 1
+        if self.sample_every > 0 and self._requests % self.sample_every == 0 and not self._sampling:
+            # Only one automatic profile at a time so sampling never piles up
+            self._sampling = True
+            return SamplingProfiler(self.interval, automatic=True).start()
+        return None
+
+    def finish(self, profiler: SamplingProfiler) -> Dict[str, Any]:
+        """Stop the profiler, store its profile and return a summary for the response"""
+        profiler.stop()
+        if profiler.automatic:
+            self._sampling = False
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.collapsed"), "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        self._trim()
+
+        return {
+            "id": profile_id,
+            "automatic": profiler.automatic,
+            "seconds": round(profiler.seconds, 3),
+            "samples": profiler.samples,
+            "top": profiler.top_functions(),
+        }
+
+    def read(self, profile_id: str) -> Optional[str]:
+        """Stored collapsed stacks of a profile, or None if it is gone"""
+        if not profile_id.replace("-", "").isalnum():
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.collapsed")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _trim(self):
+        """Delete the oldest profiles beyond max_files"""
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith(".collapsed"))
+        for name in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
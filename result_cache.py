@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResultCache:
+    """
+    Two-tier cache of parsed resume DTOs keyed by the SHA-256 of the uploaded
+    file plus the prompt, model and mapper versions that produced them.
+
+    The in-memory tier is a small LRU; the on-disk tier is SQLite with a TTL and
+    a total size budget, evicting least recently used entries first. Cached
+    values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.memory_entries = int(os.getenv("CACHE_MEMORY_ENTRIES", "256"))
+        self.max_bytes = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.ttl = float(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.db_path = os.getenv("CACHE_DB_PATH", os.path.join("cache", "results.sqlite3"))
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.enabled:
+            self._open_db()
+
+    def _open_db(self):
+        """Open the SQLite store, creating it if needed"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+
+    @staticmethod
+    def make_key(content_digest: str, filename: str, *versions: str) -> str:
+        """Build a content-addressed cache key from the SHA-256 hex digest of the file"""
+        extension = os.path.splitext(filename)[1].lower()
+        return ":".join([content_digest, extension, *[str(v) for v in versions]])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value_blob, created_at = row
+            if now - created_at >= self.ttl:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            value = json.loads(value_blob)
+            self._remember(key, created_at, value)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store value under key in both tiers"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        blob = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._remember(key, now, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(now)
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows over the size budget"""
+        self._db.execute("DELETE FROM results WHERE created_at <= ?", (now - self.ttl,))
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        stale_keys = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            stale_keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", stale_keys)
+        for (key,) in stale_keys:
+            self._memory.pop(key, None)
+
+    def reopen(self):
+        """
+        Open a fresh connection in a forked worker process; SQLite connections
+        must not be shared across fork
+        """
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._open_db()
+
+    def close(self):
+        """Close the SQLite store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,79 +1,282 @@
+import asyncio
+import mmap
 import os
 import json
-from typing import Dict, Any
-from openai import OpenAI
+import time
+import tracemalloc
+from typing import Dict, Any, Iterator, Optional, Tuple, Union
 import PyPDF2
 from docx import Document
 import io
+from extraction_pool import ExtractionPool, ExtractionPoolFull, ExtractionTimeout
+from text_preprocessing import PAGE_BREAK, estimate_tokens, preprocess_text
+from resume_sections import build_section_prompt, merge_sections, split_sections
+from fast_extractors import extract_personal_fields, guess_name, merge_personal_fields, prefill_text
+from fingerprints import FingerprintIndex, fingerprint_text
+from llm_backends import create_backend
+from llm_scheduler import INTERACTIVE, LLMScheduler
+from metrics import LLM_CALLS, LLM_TOKENS, NEAR_DUPLICATE_LOOKUPS, STAGE_SECONDS
+
+# Bump whenever the prompt changes so cached results are not reused
+PROMPT_VERSION = "2"
 
 class ResumeParser:
     def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key or api_key == "your_openai_api_key_here":
-            raise ValueError(
-                "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file. "
-                "Copy env_template.txt to .env and add your actual API key."
-            )
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-3.5-turbo"
+        # Local regex extraction of personal fields: off, validate (override the
+        # LLM's values), prefill (also drop those lines from the prompt) or
+        # offline (no LLM call at all)
+        self.fast_extraction = os.getenv("FAST_EXTRACTION", "off").lower()
+        if self.fast_extraction not in ("off", "validate", "prefill", "offline"):
+            raise ValueError("FAST_EXTRACTION must be one of: off, validate, prefill, offline")
         
-    async def parse_resume(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+        # Chat-completion backend chosen by LLM_BACKEND; offline mode needs none
+        self.llm = create_backend() if self.fast_extraction != "offline" else None
+        self.model = self.llm.model if self.llm is not None else "offline"
+        # Paces and retries every LLM call against the provider's rate limits
+        self.scheduler = LLMScheduler(self.llm) if self.llm is not None else None
+        
+        # PDF/DOCX parsing is CPU-bound, so it runs in worker processes
+        self.extraction_pool = ExtractionPool()
+        # Text budget for the LLM; reading stops once either limit is hit (0 = unlimited)
+        self.max_pages = int(os.getenv("EXTRACTION_MAX_PAGES", "30"))
+        self.max_chars = int(os.getenv("EXTRACTION_MAX_CHARS", "40000"))
+        # Report the Python heap peak of each extraction (worker processes only)
+        self.trace_memory = os.getenv("EXTRACTION_TRACE_MEMORY", "false").lower() in ("1", "true", "yes")
+        # Clean-up of extracted text before it goes into the prompt
+        self.preprocess = os.getenv("TEXT_PREPROCESSING", "true").lower() in ("1", "true", "yes")
+        self.max_prompt_tokens = int(os.getenv("PROMPT_TEXT_MAX_TOKENS", "8000"))
+        # single: one prompt for the whole resume; sections: one concurrent prompt
+        # per resume section; auto: sections once the text is long enough
+        self.structuring = os.getenv("LLM_STRUCTURING", "single").lower()
+        if self.structuring not in ("single", "sections", "auto"):
+            raise ValueError("LLM_STRUCTURING must be one of: single, sections, auto")
+        self.section_split_min_tokens = int(os.getenv("SECTION_SPLIT_MIN_TOKENS", "2500"))
+        # Resumes structured before, matched by text rather than file bytes
+        self.near_duplicates = FingerprintIndex()
+    
+    @property
+    def structure_version(self) -> str:
+        """Settings a structured resume depends on; near duplicates are only reused within one"""
+        return f"{PROMPT_VERSION}:{self.structuring}:{self.fast_extraction}:{self.model}"
+    
+    async def close(self):
+        """Close the LLM backend, extraction workers and near-duplicate index"""
+        if self.llm is not None:
+            await self.llm.close()
+        self.extraction_pool.shutdown()
+        self.near_duplicates.close()
+        
+    async def parse_resume(self, document: Union[bytes, str], filename: str, stats: Optional[Dict[str, Any]] = None,
+                           inline_extraction: bool = False, reuse_similar: bool = True,
+                           priority: str = INTERACTIVE) -> Dict[str, Any]:
         """
-        Parse resume file and extract structured data using OpenAI
+        Parse resume file and extract structured data using OpenAI.
+        document is the file content, or the path of a file holding it (read
+        by the extraction worker without copying it through this process).
+        If a stats dict is given, per-stage details are recorded in it.
+        inline_extraction extracts text in this process rather than a pool
+        worker, so a request profiler can see it. reuse_similar=False always
+        structures the text, even when a near-duplicate resume is stored.
+        priority is the LLM scheduler lane: interactive or batch.
         """
+        if stats is None:
+            stats = {}
+        
         try:
-            # Extract text from file
-            text = self._extract_text(file_content, filename)
+            # Extract text from file in the extraction pool
+            started = time.perf_counter()
+            # tracemalloc is process-wide, so a peak is only meaningful in a
+            # worker process that handles one document at a time
+            trace_memory = self.trace_memory and self.extraction_pool.max_workers > 0 and not inline_extraction
+            text, stats["extraction"] = await self.extraction_pool.run(
+                ResumeParser._extract_text, document, filename, self.max_pages, self.max_chars, trace_memory,
+                in_process=inline_extraction
+            )
+            STAGE_SECONDS.labels("extraction").time_since(started)
+            
+            if self.preprocess:
+                started = time.perf_counter()
+                text, stats["preprocessing"] = preprocess_text(text, self.max_prompt_tokens)
+                STAGE_SECONDS.labels("preprocessing").time_since(started)
             
             if not text.strip():
                 raise ValueError("No text could be extracted from the resume")
             
+            # Same text as a resume structured before (another export of it, or
+            # with a line changed): reuse that result instead of the LLM
+            fingerprint, duplicate = None, None
+            if self.near_duplicates.enabled and self.fast_extraction != "offline":
+                started = time.perf_counter()
+                # A few milliseconds of hashing and SQLite for a long resume
+                fingerprint, duplicate = await asyncio.to_thread(self._find_near_duplicate, text, reuse_similar)
+                STAGE_SECONDS.labels("near_duplicate").time_since(started)
+                if reuse_similar:
+                    result = "miss" if duplicate is None else "exact" if duplicate.exact else "near"
+                    NEAR_DUPLICATE_LOOKUPS.labels(result).inc()
+                    stats["near_duplicate"] = {"match": result}
+                    if duplicate is not None:
+                        stats["near_duplicate"]["similarity"] = duplicate.similarity
+                    stats["near_duplicate"]["microseconds"] = round((time.perf_counter() - started) * 1e6)
+            
+            fields = None
+            if self.fast_extraction != "off":
+                started = time.perf_counter()
+                if self.fast_extraction == "prefill":
+                    text, fields, lines_removed = prefill_text(text)
+                else:
+                    fields, lines_removed = extract_personal_fields(text), 0
+                stats["fast_extraction"] = {
+                    "mode": self.fast_extraction,
+                    "fields": sorted(fields),
+                    "lines_removed": lines_removed,
+                    "microseconds": round((time.perf_counter() - started) * 1e6),
+                }
+            
             # Use OpenAI to structure the data
-            structured_data = await self._structure_with_openai(text)
+            if duplicate is not None:
+                stats["structuring"] = {"mode": "near_duplicate"}
+                structured_data = duplicate.extracted_data
+                # Contact details are what a re-upload most often changes
+                if fields is None and self.near_duplicates.recheck:
+                    if not isinstance(structured_data.get("personal_info"), dict):
+                        structured_data["personal_info"] = {}
+                    stats["near_duplicate"]["overridden"] = merge_personal_fields(
+                        structured_data["personal_info"], extract_personal_fields(text)
+                    )
+            elif self.fast_extraction == "offline":
+                stats["structuring"] = {"mode": "offline"}
+                structured_data = {"personal_info": {"name": guess_name(text) or ""}}
+            elif self._split_into_sections(text):
+                stats["structuring"] = {"mode": "sections"}
+                stats["llm"] = {"lane": priority}
+                structured_data = await self._structure_by_sections(text, stats["structuring"], stats["llm"])
+            else:
+                stats["structuring"] = {"mode": "single"}
+                stats["llm"] = {"lane": priority}
+                structured_data = await self._structure_with_openai(text, stats["llm"])
+            
+            if fields is not None:
+                if not isinstance(structured_data.get("personal_info"), dict):
+                    structured_data["personal_info"] = {}
+                stats["fast_extraction"]["overridden"] = merge_personal_fields(structured_data["personal_info"], fields)
+            
+            if fingerprint is not None and duplicate is None:
+                self.near_duplicates.add(fingerprint, self.structure_version, structured_data)
             
             return structured_data
             
+        except (ExtractionPoolFull, ExtractionTimeout):
+            raise
         except Exception as e:
             raise Exception(f"Error parsing resume: {str(e)}")
     
-    def _extract_text(self, file_content: bytes, filename: str) -> str:
-        """Extract text from PDF or DOCX file"""
+    def _find_near_duplicate(self, text: str, lookup: bool):
+        """Fingerprint of the text and, if lookup is set, the stored resume it duplicates"""
+        fingerprint = fingerprint_text(text)
+        return fingerprint, self.near_duplicates.find(fingerprint, self.structure_version) if lookup else None
+    
+    def _split_into_sections(self, text: str) -> bool:
+        """Whether to structure this text section by section"""
+        if self.structuring == "single":
+            return False
+        if self.structuring == "auto" and estimate_tokens(text) < self.section_split_min_tokens:
+            return False
+        # Without recognizable headings there is nothing to split
+        return len(split_sections(text)) > 1
+    
+    @staticmethod
+    def _extract_text(document: Union[bytes, str], filename: str, max_pages: int = 0, max_chars: int = 0,
+                      trace_memory: bool = False) -> Tuple[str, Dict[str, Any]]:
+        """
+        Extract text from PDF or DOCX file (runs in an extraction worker).
+        document is the file content or a path to it.
+        Returns the text and a report of how much of the document was read.
+        """
+        if trace_memory:
+            tracemalloc.start()
         try:
             if filename.lower().endswith('.pdf'):
-                return self._extract_from_pdf(file_content)
+                text, report = ResumeParser._extract_from_pdf(document, max_pages, max_chars)
             elif filename.lower().endswith(('.doc', '.docx')):
-                return self._extract_from_docx(file_content)
+                text, report = ResumeParser._extract_from_docx(document, max_chars)
             else:
                 raise ValueError(f"Unsupported file type: {filename}")
+            if trace_memory:
+                report["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            return text, report
         except Exception as e:
             raise Exception(f"Error extracting text: {str(e)}")
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
     
-    def _extract_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF"""
+    @staticmethod
+    def _extract_from_pdf(document: Union[bytes, str], max_pages: int = 0, max_chars: int = 0) -> Tuple[str, Dict[str, Any]]:
+        """Extract text from PDF, stopping at the page or character budget"""
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            if isinstance(document, bytes):
+                return ResumeParser._read_pdf(io.BytesIO(document), max_pages, max_chars)
+            # Map the file so pages are paged in from disk as PyPDF2 seeks to them
+            with open(document, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return ResumeParser._read_pdf(mapped, max_pages, max_chars)
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
     
-    def _extract_from_docx(self, file_content: bytes) -> str:
-        """Extract text from DOCX"""
+    @staticmethod
+    def _read_pdf(stream, max_pages: int, max_chars: int) -> Tuple[str, Dict[str, Any]]:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        pages = (page.extract_text() or "" for page in pdf_reader.pages)
+        return ResumeParser._collect_text(pages, len(pdf_reader.pages), "page", max_pages, max_chars, "\n" + PAGE_BREAK)
+    
+    @staticmethod
+    def _extract_from_docx(document: Union[bytes, str], max_chars: int = 0) -> Tuple[str, Dict[str, Any]]:
+        """Extract text from DOCX, stopping at the character budget"""
         try:
-            doc = Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            # From a path, zipfile reads only the parts it needs straight from disk
+            doc = Document(io.BytesIO(document) if isinstance(document, bytes) else document)
+            paragraphs = doc.paragraphs
+            return ResumeParser._collect_text((p.text for p in paragraphs), len(paragraphs), "paragraph", 0, max_chars)
         except Exception as e:
             raise Exception(f"Error reading DOCX: {str(e)}")
     
-    async def _structure_with_openai(self, text: str) -> Dict[str, Any]:
-        """Use OpenAI to structure the resume data"""
-        try:
-            prompt = f"""
+    @staticmethod
+    def _collect_text(chunks: Iterator[str], total: int, unit: str, max_units: int, max_chars: int,
+                      separator: str = "\n") -> Tuple[str, Dict[str, Any]]:
+        """
+        Pull text chunks lazily until either budget is full and join them once.
+        A budget of 0 means unlimited.
+        """
+        parts = []
+        size = 0
+        read = 0
+        truncated = False
+        
+        for chunk in chunks:
+            if max_units and read >= max_units:
+                truncated = True
+                break
+            read += 1
+            if max_chars and size + len(chunk) + len(separator) > max_chars:
+                parts.append(chunk[:max(max_chars - size - len(separator), 0)])
+                truncated = True
+                break
+            parts.append(chunk)
+            size += len(chunk) + len(separator)
+        
+        text = separator.join(parts) + "\n" if parts else ""
+        return text, {
+            "unit": unit,
+            "total": total,
+            "read": read,
+            "skipped": total - read,
+            "chars": len(text),
+            "truncated": truncated
+        }
+    
+    @staticmethod
+    def _build_prompt(text: str) -> str:
+        """Single-shot prompt that structures the whole resume"""
+        return f"""
             You are an expert resume parser with deep understanding of academic and professional resumes. 
             Extract and structure the following resume information into a JSON format with maximum accuracy.
             
@@ -187,31 +390,18 @@ class ResumeParser:
             
             Return only the JSON structure with EXACT information from the resume, no placeholders.
             """
+    
+    async def _structure_with_openai(self, text: str, llm_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Use OpenAI to structure the resume data"""
+        try:
+            prompt = self._build_prompt(text)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume parser specializing in academic and professional resumes. You understand PhD programs, research work, publications, and career progression. Extract information with maximum accuracy and attention to detail. Return only valid JSON with exact information from the resume."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=4000
-            )
-            
-            # Extract JSON from response
-            content = response.choices[0].message.content.strip()
-            
-            # Clean up the response to extract JSON
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Parse JSON
-            structured_data = json.loads(content)
+            structured_data = await self._complete_json(prompt, llm_stats)
             
             # Ensure all string values are properly converted
+            started = time.perf_counter()
             structured_data = self._sanitize_data_types(structured_data)
+            STAGE_SECONDS.labels("sanitize").time_since(started)
             return structured_data
             
         except json.JSONDecodeError as e:
@@ -219,6 +409,77 @@ class ResumeParser:
         except Exception as e:
             raise Exception(f"Error calling OpenAI API: {str(e)}")
     
+    async def _structure_by_sections(self, text: str, stats: Dict[str, Any],
+                                     llm_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Structure each resume section with its own smaller prompt, all
+        concurrently, and merge the results into the single-prompt shape
+        """
+        sections = split_sections(text)
+        stats["sections"] = {section: {"chars": len(body)} for section, body in sections.items()}
+        
+        async def structure(section: str, body: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            result = await self._complete_json(build_section_prompt(section, body), llm_stats)
+            stats["sections"][section]["seconds"] = round(time.perf_counter() - started, 3)
+            return result
+        
+        tasks = {
+            section: asyncio.ensure_future(structure(section, body))
+            for section, body in sections.items()
+        }
+        try:
+            await asyncio.gather(*tasks.values())
+        except json.JSONDecodeError as e:
+            raise Exception(f"Error parsing OpenAI response as JSON: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {str(e)}")
+        finally:
+            # One failed section fails the resume; do not leave the rest running
+            for task in tasks.values():
+                task.cancel()
+        
+        merged = merge_sections({section: task.result() for section, task in tasks.items()})
+        started = time.perf_counter()
+        merged = self._sanitize_data_types(merged)
+        STAGE_SECONDS.labels("sanitize").time_since(started)
+        return merged
+    
+    async def _complete_json(self, prompt: str, llm_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one structuring prompt through the scheduler and parse the JSON
+        reply. llm_stats names the lane and collects queueing and retries.
+        """
+        started = time.perf_counter()
+        content, usage = await self.scheduler.complete(
+            messages=[
+                {"role": "system", "content": "You are an expert resume parser specializing in academic and professional resumes. You understand PhD programs, research work, publications, and career progression. Extract information with maximum accuracy and attention to detail. Return only valid JSON with exact information from the resume."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=4000,
+            stats=llm_stats
+        )
+        STAGE_SECONDS.labels("llm").time_since(started)
+        LLM_CALLS.labels(self.llm.name).inc()
+        LLM_TOKENS.labels("prompt").inc(usage.get("prompt_tokens", 0))
+        LLM_TOKENS.labels("completion").inc(usage.get("completion_tokens", 0))
+        
+        # Extract JSON from response
+        content = content.strip()
+        
+        # Clean up the response to extract JSON
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        
+        # Parse JSON
+        started = time.perf_counter()
+        parsed = json.loads(content)
+        STAGE_SECONDS.labels("json_parse").time_since(started)
+        return parsed
+    
     def _sanitize_data_types(self, data):
         """Recursively sanitize data types to ensure strings are strings"""
         if isinstance(data, dict):
@@ -0,0 +1,235 @@
+import re
+from typing import Any, Dict, List
+
+# Sections a resume is split into, each structured by its own prompt
+SECTIONS = ("personal", "education", "experience", "research", "additional")
+
+# Headings (compared after normalization) that start each section; text before
+# the first heading is the resume header and belongs to "personal"
+_HEADINGS = {
+    "personal": r"personal (details|information|info|profile|data|particulars)|contact( details| information| info)?|bio.?data",
+    "education": r"(educational|academic) (qualifications?|background|details|profile|record)|education( and training| details)?"
+                 r"|qualifications?|academics?",
+    "experience": r"((work|professional|teaching|industry|industrial|employment|academic|administrative) )?experience"
+                  r"|(work|employment|career) history|employment|positions held|teaching",
+    "research": r"research( experience| interests?| work| projects| profile| areas?| and publications)?|publications?"
+                r"|(list of )?(journal|conference) (papers|publications|articles)|papers (presented|published)"
+                r"|conferences?( attended| and workshops)?|workshops( attended)?|seminars( attended)?|presentations"
+                r"|patents|book chapters|books|collaborations|thesis|projects( guided)?|ph\.?d\.? (thesis|details)",
+    "additional": r"(technical |key |core )?skills( and expertise)?|languages( known)?|certifications?|courses|awards"
+                  r"( and (honou?rs|achievements|recognitions?))?|honou?rs( and awards)?|achievements|extra.?curricular"
+                  r"( activities)?|co.?curricular( activities)?|volunteer(ing| work| experience)?|hobbies|interests"
+                  r"|(professional |career )?(profile|summary|objective)|about me|references|declaration"
+                  r"|memberships?|professional memberships?|strengths",
+}
+_HEADING_PATTERNS = [(section, re.compile(f"(?:{pattern})")) for section, pattern in _HEADINGS.items()]
+_HEADING_CLEANUP = re.compile(r"[^a-z.]+")
+
+# Longest line that can still be a heading
+MAX_HEADING_CHARS = 50
+
+
+def _heading_section(line: str):
+    """Section a line is the heading of, or None for ordinary text"""
+    if not line or len(line) > MAX_HEADING_CHARS:
+        return None
+    key = _HEADING_CLEANUP.sub(" ", line.lower().replace("&", " and ")).strip(" .")
+    if not key:
+        return None
+    for section, pattern in _HEADING_PATTERNS:
+        if pattern.fullmatch(key):
+            return section
+    return None
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Split resume text into SECTIONS by their headings. Sections that appear
+    more than once are joined; sections with no text are left out.
+    """
+    parts: Dict[str, List[str]] = {section: [] for section in SECTIONS}
+    current = "personal"
+    for line in text.split("\n"):
+        section = _heading_section(line.strip())
+        if section:
+            current = section
+        parts[current].append(line)
+
+    sections = {}
+    for section, lines in parts.items():
+        body = "\n".join(lines).strip()
+        if body:
+            sections[section] = body
+    return sections
+
+
+_RULES = """
+            DATA ACCURACY:
+               - Extract EXACT text from the resume - no placeholders or generic text
+               - If information is missing, use null (not empty arrays or empty strings)
+            """
+
+SECTION_PROMPTS = {
+    "personal": ("""
+            Extract the candidate's personal details from this part of a resume.
+            """ + _RULES, """
+            {
+                "personal_info": {
+                    "name": "Full Name",
+                    "email": "email@example.com",
+                    "phone": "phone number",
+                    "address": "full address",
+                    "date_of_birth": "YYYY-MM-DD",
+                    "gender": "Male/Female/Other",
+                    "marital_status": "Single/Married/Divorced/Widow/Other",
+                    "nationality": "Nationality",
+                    "religion": "Religion",
+                    "blood_group": "Blood Group",
+                    "aadhar_no": "Aadhar Number",
+                    "passport_no": "Passport Number"
+                }
+            }
+            """),
+    "education": ("""
+            Extract every qualification from this education section of a resume.
+
+            EDUCATION YEARS:
+               - For date ranges like "2016-2018", use the END year (2018) for year_of_completion
+               - For ongoing PhD/education: Set year_of_completion to "" (empty) and current_status to actual status like "Thesis Submitted"
+               - Only use actual completion years, not start years
+
+            EDUCATION COURSE NAMES:
+               - Use proper degree names: "Ph.D.", "M.Sc.", "B.Sc.", "Class 12", "Class 10"
+               - Do NOT use university names as course names
+               - ALWAYS provide course names, never leave them empty
+
+            QUALIFICATION LEVELS:
+               - Use exact terms: "PhD", "MSc", "BSc", "Class 12", "Class 10"
+            """ + _RULES, """
+            {
+                "education": [
+                    {
+                        "qualification_level": "Class 10/Class 12/UG/PG/PhD",
+                        "course": "Course Name",
+                        "specialization": "Specialization",
+                        "institute": "Institute Name",
+                        "board_or_university": "Board/University",
+                        "year_of_completion": "YYYY (use END year for ranges, current year for ongoing)",
+                        "current_status": "Current Status if ongoing (e.g., 'Thesis Submitted', 'Pursuing')",
+                        "grade_or_percentage": "Grade/Percentage",
+                        "country": "Country",
+                        "state": "State"
+                    }
+                ]
+            }
+            """),
+    "experience": ("""
+            Extract every position from this work experience section of a resume.
+
+            WORK EXPERIENCE DATES:
+               - For ongoing positions (PhD, current job): Set to_date as "Present"
+               - Be precise with from_date (use actual start year)
+               - Calculate years/months accurately from the dates
+            """ + _RULES, """
+            {
+                "work_experience": [
+                    {
+                        "designation": "Job Title",
+                        "company": "Company Name",
+                        "employment_type": "fulltime/parttime/contract",
+                        "from_date": "YYYY-MM-DD",
+                        "to_date": "YYYY-MM-DD or Present",
+                        "current_salary": "Salary",
+                        "notice_period": "Notice Period in days",
+                        "years": "Years of experience",
+                        "months": "Months of experience",
+                        "description": "Job description"
+                    }
+                ]
+            }
+            """),
+    "research": ("""
+            Extract the research record from this part of an academic resume.
+
+            RESEARCH EXPERIENCE:
+               - If it shows a PhD, publications, research work or conferences, set has_research: true
+               - Extract EXACT publication titles, conference names, collaborator names
+               - Look for research areas, awards, presentations
+            """ + _RULES, """
+            {
+                "research_experience": {
+                    "has_research": true/false,
+                    "research_areas": ["area1", "area2"],
+                    "publications": ["EXACT publication title 1", "EXACT publication title 2"],
+                    "conferences": ["EXACT conference name 1", "EXACT conference name 2"],
+                    "awards": ["EXACT award name 1", "EXACT award name 2"],
+                    "collaborations": ["EXACT collaborator name 1", "EXACT collaborator name 2"]
+                }
+            }
+            """),
+    "additional": ("""
+            Extract the additional information from this part of a resume:
+            profile/summary, exact skills, languages, certifications, volunteer
+            work, awards and achievements.
+            """ + _RULES, """
+            {
+                "additional_informations": {
+                    "profile_summary": "Professional summary/profile section",
+                    "skills": ["skill1", "skill2", "skill3"],
+                    "awards": ["EXACT award name 1", "EXACT award name 2"],
+                    "languages": ["language1", "language2"] or null,
+                    "certifications": ["cert1", "cert2"] or null,
+                    "volunteer_work": ["volunteer1", "volunteer2"] or null
+                }
+            }
+            """),
+}
+
+# Result key each section prompt fills and its value when the section is absent
+SECTION_KEYS = {
+    "personal": ("personal_info", dict),
+    "education": ("education", list),
+    "experience": ("work_experience", list),
+    "research": ("research_experience", dict),
+    "additional": ("additional_informations", dict),
+}
+
+# research_experience fields the single-shot prompt also repeats in additional_informations
+_SHARED_RESEARCH_FIELDS = {
+    "publications": "publications",
+    "conferences": "conferences",
+    "collaborations": "collaborators",
+    "awards": "awards",
+}
+
+
+def build_section_prompt(section: str, text: str) -> str:
+    """Prompt that structures one section of the resume"""
+    instructions, schema = SECTION_PROMPTS[section]
+    return f"""{instructions}
+            Structure the data as follows:
+            {schema}
+            Resume Section:
+            {text}
+
+            Return only the JSON structure with EXACT information from the resume, no placeholders.
+            """
+
+
+def merge_sections(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-section results into the extracted_data shape of the
+    single-shot prompt, so DTOMapper.map_to_dto accepts either
+    """
+    merged: Dict[str, Any] = {}
+    for section in SECTIONS:
+        key, empty = SECTION_KEYS[section]
+        value = results.get(section, {}).get(key)
+        merged[key] = value if isinstance(value, empty) else empty()
+
+    research = merged["research_experience"]
+    additional = merged["additional_informations"]
+    for research_key, additional_key in _SHARED_RESEARCH_FIELDS.items():
+        if research.get(research_key) and not additional.get(additional_key):
+            additional[additional_key] = research[research_key]
+    return merged
@@ -0,0 +1,95 @@
+import gzip
+import io
+import json
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional binary encoding
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def strip_nulls(obj: Any) -> Any:
+    """Return a copy of obj without None-valued keys, recursively"""
+    if isinstance(obj, dict):
+        return {key: strip_nulls(value) for key, value in obj.items() if value is not None}
+    if isinstance(obj, list):
+        return [strip_nulls(item) for item in obj]
+    return obj
+
+
+def project_fields(dto: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Return only the requested top-level DTO sections"""
+    unknown = [field for field in fields if field not in dto]
+    if unknown:
+        raise ValueError(f"Unknown DTO fields: {', '.join(unknown)}")
+    return {field: dto[field] for field in fields}
+
+
+def shape_dto(dto: Dict[str, Any], fields: Optional[str] = None, exclude_nulls: bool = False) -> Dict[str, Any]:
+    """
+    Apply the compact response options to a DTO without mutating it.
+    fields is a comma-separated list of top-level sections.
+    """
+    if fields:
+        dto = project_fields(dto, [field.strip() for field in fields.split(",") if field.strip()])
+    if exclude_nulls:
+        dto = strip_nulls(dto)
+    return dto
+
+
+def encode(payload: Any, accept: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Encode a response payload in the best format the client accepts:
+    MessagePack when asked for and installed, JSON otherwise
+    """
+    if accept and msgpack is not None and any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return msgpack.packb(payload, use_bin_type=True), MSGPACK_MEDIA_TYPES[0]
+    return dumps(payload), JSON_MEDIA_TYPE
+
+
+class _SyncFlushGzipFile(gzip.GzipFile):
+    """GzipFile that flushes every write, so each chunk can be decoded on arrival"""
+
+    def write(self, data) -> int:
+        written = super().write(data)
+        self.flush(zlib.Z_SYNC_FLUSH)
+        return written
+
+
+class StreamingGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that flushes the compressor after every body chunk.
+    Starlette's version buffers streamed chunks inside the compressor until
+    it fills, so an NDJSON stream reached the client all at the end.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            responder.gzip_buffer = io.BytesIO()
+            responder.gzip_file = _SyncFlushGzipFile(
+                mode="wb", fileobj=responder.gzip_buffer, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
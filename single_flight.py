@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one task per key at a time. Callers arriving while a task for
+    their key is running wait for it and share its result or exception instead
+    of starting their own.
+
+    Each caller waits through asyncio.shield, so a caller that is cancelled
+    (a client that disconnects) leaves the task running for the others. The
+    task is only cancelled when its last caller leaves. Results are not kept:
+    once the task finishes, the next caller starts a new one.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+
+    def running(self, key: str) -> bool:
+        """Whether a task for key is in flight, so a run() now would join it"""
+        return key in self._calls
+
+    async def run(self, key: str, start: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of the task in flight for key, or of a new one created by start()
+        (a coroutine or future) when there is none
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(start()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                # Every caller has gone: nobody wants the result any more, and a
+                # caller arriving before the cancellation lands starts afresh
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
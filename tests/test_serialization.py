@@ -0,0 +1,45 @@
+import asyncio
+import zlib
+
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from serialization import StreamingGZipMiddleware
+
+LINES = [b'{"index":%d,"success":true}\n' % index for index in range(3)]
+
+
+async def _stream(request):
+    async def lines():
+        for line in LINES:
+            yield line
+            await asyncio.sleep(0)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def test_streamed_lines_decode_as_they_arrive():
+    app = StreamingGZipMiddleware(Starlette(routes=[Route("/stream", _stream)]), minimum_size=1)
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": "/stream",
+        "raw_path": b"/stream", "query_string": b"", "root_path": "", "server": ("test", 80),
+        "client": ("test", 1), "headers": [(b"accept-encoding", b"gzip")],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+
+    assert dict(messages[0]["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = [decoder.decompress(message["body"]) for message in messages[1:]]
+    # Every line is readable from the chunk that carried it
+    assert chunks[:len(LINES)] == LINES
+    assert b"".join(chunks) + decoder.flush() == b"".join(LINES)
+    assert decoder.eof
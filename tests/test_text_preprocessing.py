@@ -0,0 +1,35 @@
+from text_preprocessing import PAGE_BREAK, preprocess_text
+
+
+def _pages(*bodies):
+    return PAGE_BREAK.join(
+        "\n".join(["Jane Doe - Curriculum Vitae", *body, f"Page {number} of {len(bodies)}"])
+        for number, body in enumerate(bodies, 1)
+    )
+
+
+def test_repeated_header_and_page_number_removed():
+    text, report = preprocess_text(_pages(
+        ["Experience", "Lecturer, Example University", "Taught physics", "Ran the lab", "Advised students"],
+        ["Education", "PhD in Physics", "Thesis on thin films", "Published twice", "Graduated with honours"],
+        ["Skills", "Python", "Teaching", "Spectroscopy", "Writing"],
+    ))
+
+    assert "Curriculum Vitae" not in text
+    assert "Page" not in text
+    assert report["header_footer_lines_removed"] == 6
+
+
+def test_numbers_in_page_body_kept():
+    # A year and a grade on lines of their own look like bare page numbers,
+    # but they sit in the middle of the page, not at its edges
+    text, _ = preprocess_text(_pages(
+        ["Education", "Class 10", "Year of passing", "Completed", "2016", "Grade", "9", "CBSE", "Delhi", "School"],
+        ["Experience", "Teacher", "Joined in", "Left in", "2019", "Rating", "9", "Example School", "Delhi", "Maths"],
+        ["Skills", "Python", "Teaching", "Writing", "2020", "Level", "9", "Speaking", "Reading", "Drawing"],
+    ))
+
+    lines = text.split("\n")
+    assert "2016" in lines
+    assert "2019" in lines
+    assert lines.count("9") == 3
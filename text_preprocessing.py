@@ -0,0 +1,144 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional exact token counts
+    tiktoken = None
+
+# Separator the PDF extractor puts between pages
+PAGE_BREAK = "\f"
+
+# Lines in this many lines from the top or bottom of a page can be headers/footers
+HEADER_FOOTER_DEPTH = 3
+
+_WORD_OR_SYMBOL = re.compile(r"\w+|[^\w\s]")
+_HYPHEN_BREAK = re.compile(r"([a-z])-\n([a-z])")
+_INLINE_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_PAGE_NUMBER = re.compile(r"^[-–(\s]*(page\s*)?\d+(\s*(of|/)\s*\d+)?[-–)\s]*$", re.IGNORECASE)
+_BOILERPLATE = re.compile(
+    r"^(declaration:?|i (do )?hereby declare\b.*|references? (are )?available (up)?on request\.?)$",
+    re.IGNORECASE,
+)
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken when installed, otherwise estimate them
+    locally: one token per symbol and per four characters of each word
+    """
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _WORD_OR_SYMBOL.findall(text))
+
+
+def _line_key(line: str) -> str:
+    """Normalize a line for header/footer comparison ("Page 2 of 5" == "Page 3 of 5")"""
+    line = line.strip()
+    if _PAGE_NUMBER.match(line):
+        return "<page number>"
+    return line.lower()
+
+
+def _edge_lines(lines: List[str]) -> List[int]:
+    """Indexes of the first and last HEADER_FOOTER_DEPTH non-blank lines of a page"""
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(content[:HEADER_FOOTER_DEPTH] + content[-HEADER_FOOTER_DEPTH:]))
+
+
+def _remove_repeated_page_lines(pages: List[List[str]]) -> Tuple[List[List[str]], int]:
+    """
+    Drop lines that repeat at the top or bottom of most pages. Only lines at
+    those edge positions are compared and removed, so a body line such as a
+    year or a grade on its own is kept even when it looks like a page number.
+    """
+    if len(pages) < 2:
+        return pages, 0
+
+    edges = [{i: _line_key(lines[i]) for i in _edge_lines(lines)} for lines in pages]
+    counts = Counter()
+    for keys in edges:
+        counts.update(set(keys.values()))
+
+    threshold = max(2, math.ceil(len(pages) / 2))
+    repeated = {key for key, count in counts.items() if key and count >= threshold}
+    if not repeated:
+        return pages, 0
+
+    removed = 0
+    cleaned = []
+    for lines, keys in zip(pages, edges):
+        kept = [line for i, line in enumerate(lines) if keys.get(i) not in repeated]
+        removed += len(lines) - len(kept)
+        cleaned.append(kept)
+    return cleaned, removed
+
+
+def preprocess_text(text: str, max_tokens: int = 0) -> Tuple[str, Dict[str, Any]]:
+    """
+    Shrink extracted resume text before it goes into the LLM prompt:
+    remove repeated page headers/footers, join hyphenated line breaks,
+    normalize whitespace, collapse duplicate lines and drop boilerplate
+    declarations, then cut to max_tokens (0 = no limit).
+    Returns the text and a report with token counts before and after.
+    """
+    tokens_before = estimate_tokens(text)
+
+    pages = [page.split("\n") for page in text.split(PAGE_BREAK)]
+    pages, header_lines = _remove_repeated_page_lines(pages)
+    text = "\n".join("\n".join(lines) for lines in pages)
+
+    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+
+    lines = []
+    duplicate_lines = 0
+    boilerplate_lines = 0
+    previous = None
+    for raw_line in text.split("\n"):
+        line = _INLINE_SPACE.sub(" ", raw_line).strip()
+        if not line:
+            # Keep at most one blank line as a section separator
+            if lines and lines[-1]:
+                lines.append("")
+            previous = None
+            continue
+        if line == previous:
+            duplicate_lines += 1
+            continue
+        if _BOILERPLATE.match(line):
+            boilerplate_lines += 1
+            continue
+        lines.append(line)
+        previous = line
+
+    text = "\n".join(lines).strip()
+
+    truncated = False
+    if max_tokens and estimate_tokens(text) > max_tokens:
+        kept = []
+        budget = max_tokens
+        for line in text.split("\n"):
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                break
+            kept.append(line)
+            budget -= cost
+        text = "\n".join(kept)
+        truncated = True
+
+    tokens_after = estimate_tokens(text)
+    return text, {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "header_footer_lines_removed": header_lines,
+        "duplicate_lines_removed": duplicate_lines,
+        "boilerplate_lines_removed": boilerplate_lines,
+        "truncated": truncated
+    }
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import tempfile
+from typing import Dict, Optional
+
+from starlette.exceptions import HTTPException
+
+# File signatures checked before a document is parsed
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"  # DOCX (and DOC files that are really DOCX)
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # legacy Word DOC
+# PDF readers accept a header anywhere in the first kilobyte
+SIGNATURE_BYTES = 1024
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def has_valid_signature(filename: str, head: bytes) -> bool:
+    """Whether the first bytes of a file match the type its extension claims"""
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        return PDF_MAGIC in head[:SIGNATURE_BYTES]
+    if name.endswith(".docx"):
+        return head.startswith(ZIP_MAGIC)
+    if name.endswith(".doc"):
+        return head.startswith((OLE_MAGIC, ZIP_MAGIC))
+    return False
+
+
+class StoredUpload:
+    """
+    An uploaded document streamed to a temporary file. Parsers read it from
+    disk (memory-mapped for PDFs), so the upload is never held in memory.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self._references = 1
+
+    def retain(self) -> "StoredUpload":
+        """Keep the file until one more close(), for work that may outlive the request"""
+        self._references += 1
+        return self
+
+    def close(self):
+        """Delete the temporary file once every holder has closed it"""
+        self._references -= 1
+        if self._references > 0:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def store_upload(source, filename: str, max_bytes: int = 0, directory: Optional[str] = None) -> StoredUpload:
+    """
+    Copy a file object to a temporary file in fixed-size chunks, hashing it
+    on the way. Blocking: call it from a thread. Raises HTTPException 415 if
+    the content does not match the extension and 413 beyond max_bytes.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    fd, path = tempfile.mkstemp(suffix=extension, prefix="upload-", dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as target:
+            head = source.read(SIGNATURE_BYTES)
+            if not has_valid_signature(filename, head):
+                raise HTTPException(status_code=415, detail=f"{filename} does not match its file type")
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                target.write(chunk)
+                chunk = source.read(COPY_CHUNK_BYTES)
+    except BaseException:
+        os.remove(path)
+        raise
+    return StoredUpload(path, size, digest.hexdigest())
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware capping request bodies per path. A declared
+    Content-Length over the limit is answered with 413 before any of the body
+    is read; otherwise the body is counted as it streams in and the request
+    fails with 413 as soon as it crosses the limit.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path: limit for path, limit in limits.items() if limit > 0}
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if not limit:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await _send_too_large(send, limit)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing, which FastAPI passes through as a 413
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_too_large(send, limit: int):
+    body = f'{{"detail":"Request body exceeds {limit} bytes"}}'.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close")],
+    })
+    await send({"type": "http.response.body", "body": body})
+